@@ -0,0 +1,58 @@
+"""
+Библиотека для работы с шилдом RPiPWM для Raspberry Pi.
+Подмодули (bus, record, pwm, display, adc, gpio, daemon, power, animation, loop) загружаются при первом обращении к их классам,
+поэтому, например, скрипт, работающий только с дисплеем, не тратит время и память на GPIO.
+"""
+import importlib
+
+# публичное имя -> подмодуль, в котором оно описано
+_exports = {
+    "I2cTransport": "bus",
+    "setI2cTransport": "bus",
+    "startRecording": "record",
+    "stopRecording": "record",
+    "BusLog": "record",
+    "replay": "record",
+    "BusDaemon": "daemon",
+    "DaemonClient": "daemon",
+    "IdleManager": "power",
+    "Battery": "adc",
+    "PwmFreq": "pwm",
+    "PwmBase": "pwm",
+    "Servo90": "pwm",
+    "Servo120": "pwm",
+    "Servo180": "pwm",
+    "Servo270": "pwm",
+    "ForwardMotor": "pwm",
+    "ReverseMotor": "pwm",
+    "Switch": "pwm",
+    "stagePwm": "pwm",
+    "flushPwm": "pwm",
+    "SSD1306_128_64": "display",
+    "SSD1306_128_32": "display",
+    "SSD1306_96_16": "display",
+    "compileAnimation": "animation",
+    "Animation": "animation",
+    "ControlLoop": "loop",
+    "Overrun": "loop",
+    "Gpio": "gpio",
+    "ButtonEvent": "gpio",
+    "ButtonEventType": "gpio",
+    "LedPattern": "gpio",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    """Ленивая загрузка: подмодуль импортируется при первом обращении к его имени"""
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    globals()[name] = value     # дальше обращения идут без __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
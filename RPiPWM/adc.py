@@ -0,0 +1,77 @@
+import time
+import threading
+
+from .bus import _I2c
+
+
+class Battery(threading.Thread):
+    """Класс для получения информации от одноканального АЦП MCP3221."""
+    def __init__(self, vRef=3.3, gain=7.66):
+        """
+        Конструктор класса.
+        :param vRef: опорное напряжение (относительно которого происходит измерение)
+        :param gain: коэффициент делителя напряжения (если он есть)
+        """
+        self._addr = 0x4D
+        self._vRef = vRef
+        self._gain = gain
+        self._i2c = _I2c()
+        threading.Thread.__init__(self, daemon=True)
+        self.__exit = False  # флаг завершения тредов
+        self._filteredVoltage = 0   # отфильтрованное значение напряжения
+        self._K = 0.1   # коэффициент фильтрации
+        self._period = 0.05     # период опроса АЦП, с
+
+    def run(self):
+        """Метод для threading. Запуск вычислений в отдельном потоке."""
+        while not self.__exit:    # по умолчанию 20 раз в секунду опрашивает АЦП, фильтрует значение
+            self._filteredVoltage = self._filteredVoltage * (1 - self._K) + self.getVoltageInstant() * self._K
+            time.sleep(self._period)
+
+    def setPeriod(self, period: float):
+        """
+        Изменение периода опроса АЦП. Коэффициент фильтрации пересчитывается так,
+        чтобы фильтр сглаживал за то же время, что и при периоде 0.05 с.
+        :param period: период опроса, с
+        """
+        if period <= 0:
+            raise ValueError("Period must be positive.")
+        self._K = 1 - (1 - 0.1) ** (period / 0.05)
+        self._period = period
+
+    def getPeriod(self):
+        """Возвращает период опроса АЦП, с"""
+        return self._period
+
+    def _readRaw(self):
+        """Чтение cырых показаний с АЦП - просто 2 байта."""
+        reading = self._i2c.readRaw(self._addr, 0x00, 2)
+        return (reading[0] << 8) + reading[1]
+
+    def _readConverted(self):
+        """Преобразование к напряжению, относительно опорного (после предделителя)"""
+        voltage = (self._readRaw() / 4095) * self._vRef  # 4095 - число разрядов АЦП
+        return voltage
+
+    def getVoltageInstant(self):
+        """Возвращает моментальное значение напряжения аккумулятора с АЦП."""
+        battery = self._readConverted() * self._gain
+        return round(battery, 2)
+
+    def stop(self):
+        """Остановка вычислений в отдельном потоке."""
+        self.__exit = True
+
+    def getVoltageFiltered(self):
+        """Возвращает отфильтрованное значение напряжения."""
+        return round(self._filteredVoltage, 2)
+
+    def calibrate(self, exactVoltage: float):
+        """Подгонка коэффициента делитея напряжения."""
+        value = 0
+        for i in range(100):
+            value += self._readConverted()
+            time.sleep(0.01)
+        value /= 100
+        self._gain = exactVoltage/value
+    # TODO: возможно сделать калибровку более точной (но вроде как без нее все работает и так)
@@ -0,0 +1,184 @@
+"""
+Заранее подготовленные анимации для дисплеев SSD1306.
+
+Кадры (картинки PIL или GIF) один раз преобразуются в формат памяти дисплея и сохраняются в файл,
+имя которого - хэш исходных данных и размер дисплея, поэтому повторная подготовка той же анимации
+ничего не делает. При воспроизведении файл отображается в память через mmap, и кадры отправляются
+на шину прямо из него, без преобразования и копирования.
+
+Формат файла: заголовок _HEADER, длительности кадров (uint16, мс), затем кадры подряд.
+Каждый кадр хранится вместе с управляющим байтом 0x40 (данные для дисплея), т.е. это готовый блок для шины.
+
+Подготовка из командной строки:
+    python3 -m RPiPWM.animation splash.gif --size 128x64
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+
+from .display import _imageToPages, _SSD1306_I2C_ADDRESS, _SSD1306_COLUMNADDR, _SSD1306_PAGEADDR
+
+_MAGIC = b"RPWMANI1"
+_HEADER = struct.Struct("<8sHHII")     # сигнатура, ширина, высота, количество кадров, размер кадра (с управляющим байтом)
+DEFAULT_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "rpipwm")
+
+
+def _frameSource(frames):
+    """Перебор кадров: список картинок PIL, многокадровая картинка или путь к файлу (GIF)"""
+    if isinstance(frames, (str, bytes, os.PathLike)):
+        from PIL import Image
+        frames = Image.open(frames)
+    if hasattr(frames, "n_frames"):     # многокадровая картинка PIL
+        from PIL import ImageSequence
+        return ImageSequence.Iterator(frames)
+    if hasattr(frames, "mode"):         # одна картинка
+        return [frames]
+    return frames
+
+
+def _cacheKey(frames, width: int, height: int, durations, defaultDuration: int):
+    """Хэш исходных данных анимации (для файла - его содержимое, для картинок - пиксели) и длительностей кадров"""
+    digest = hashlib.sha256(_MAGIC)
+    digest.update(struct.pack("<HH", width, height))
+    if durations is not None:
+        digest.update(b"durations")
+        digest.update(array("I", durations).tobytes())
+    else:   # длительности из GIF, а для кадров без нее - defaultDuration
+        digest.update(b"default")
+        digest.update(struct.pack("<I", int(defaultDuration)))
+    if isinstance(frames, (str, bytes, os.PathLike)):
+        with open(frames, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+    else:
+        for frame in _frameSource(frames):
+            digest.update("{}{}".format(frame.mode, frame.size).encode())
+            digest.update(frame.tobytes())
+    return digest.hexdigest()
+
+
+def compileAnimation(frames, width: int, height: int, durations=None, defaultDuration=100, cacheDir=DEFAULT_CACHE):
+    """
+    Подготовка анимации. Если такая анимация уже есть в кэше - просто возвращает путь к ней.
+    :param frames: путь к GIF, многокадровая картинка PIL или список картинок PIL размером width x height
+    :param width: ширина дисплея
+    :param height: высота дисплея
+    :param durations: длительности кадров в мс (None - из GIF, а если там нет - defaultDuration)
+    :param defaultDuration: длительность кадра по умолчанию, мс
+    :param cacheDir: каталог для подготовленных анимаций
+    :return: путь к файлу анимации
+    """
+    key = _cacheKey(frames, width, height, durations, defaultDuration)
+    path = os.path.join(cacheDir, "{}-{}x{}.anim".format(key, width, height))
+    if os.path.exists(path):
+        return path
+
+    frameSize = width * (height // 8) + 1
+    packed = bytearray()
+    frameDurations = array("H")
+    for index, frame in enumerate(_frameSource(frames)):
+        if durations is not None:
+            duration = durations[index]
+        else:
+            duration = frame.info.get("duration") or defaultDuration
+        if frame.mode != '1':
+            frame = frame.convert('1')
+        packed.append(0x40)     # управляющий байт: дальше данные для памяти дисплея
+        packed += bytes(_imageToPages(frame, width, height))
+        frameDurations.append(min(int(duration), 0xFFFF))
+    if not frameDurations:
+        raise ValueError("Animation must have at least one frame.")
+
+    os.makedirs(cacheDir, exist_ok=True)
+    tmpPath = "{}.{}.tmp".format(path, os.getpid())    # пишем во временный файл, чтобы не оставить недописанный
+    with open(tmpPath, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, width, height, len(frameDurations), frameSize))
+        f.write(frameDurations.tobytes())
+        f.write(packed)
+    os.replace(tmpPath, path)
+    return path
+
+
+class Animation:
+    """Подготовленная анимация, отображенная в память"""
+    def __init__(self, path: str):
+        """
+        Конструктор класса
+        :param path: путь к файлу, который вернул compileAnimation
+        """
+        with open(path, "rb") as f:
+            # ACCESS_COPY - изменяемое отображение (на диск не пишется), такой буфер можно отдать в ioctl без копии
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, self._width, self._height, self._count, self._frameSize = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError("{} is not an animation file".format(path))
+        offset = _HEADER.size
+        self._durations = [d / 1000 for d in struct.unpack_from("<{}H".format(self._count), self._map, offset)]
+        offset += 2 * self._count
+        view = memoryview(self._map)
+        self._frames = [view[offset + i * self._frameSize:offset + (i + 1) * self._frameSize]
+                        for i in range(self._count)]
+
+    def getSize(self):
+        """Возвращает ширину и высоту кадров"""
+        return self._width, self._height
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        """Закрытие файла (если на кадры еще есть ссылки - файл закроется, когда они будут удалены)"""
+        for frame in self._frames:
+            frame.release()
+        self._frames = []
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def play(self, display, loops=1, stop=None):
+        """
+        Воспроизведение на дисплее. Моменты смены кадров отсчитываются от начала воспроизведения,
+        поэтому задержки на шине не накапливаются.
+        :param display: объект дисплея (SSD1306_*) того же размера, что и анимация
+        :param loops: сколько раз проиграть (0 - бесконечно)
+        :param stop: threading.Event, по которому воспроизведение прекращается досрочно
+        """
+        if display.getSize() != (self._width, self._height):
+            raise ValueError('animation must be same dimensions as display ({0}x{1})'.format(*display.getSize()))
+        i2c = display._i2c
+        window = bytes([0x00,   # управляющий байт: дальше команды
+                        _SSD1306_COLUMNADDR, 0, self._width - 1,
+                        _SSD1306_PAGEADDR, 0, self._height // 8 - 1])
+        stop = stop if stop is not None else threading.Event()
+        deadline = time.monotonic()
+        loop = 0
+        while loops == 0 or loop < loops:
+            for frame, duration in zip(self._frames, self._durations):
+                i2c.writeBlock(_SSD1306_I2C_ADDRESS, window)
+                i2c.writeBlock(_SSD1306_I2C_ADDRESS, frame)
+                deadline += duration
+                if stop.wait(max(0, deadline - time.monotonic())):
+                    return
+            loop += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompile an animation for an SSD1306 display")
+    parser.add_argument("source", help="GIF (or any multi-frame image) to convert")
+    parser.add_argument("--size", default="128x64", help="display size, e.g. 128x64, 128x32, 96x16")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="cache directory")
+    parser.add_argument("--duration", type=int, default=100, help="frame duration (ms) if the source has none")
+    args = parser.parse_args(argv)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    print(compileAnimation(args.source, width, height, defaultDuration=args.duration, cacheDir=args.cache))
+
+
+if __name__ == "__main__":
+    main()
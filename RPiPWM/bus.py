@@ -0,0 +1,296 @@
+"""
+Работа с шиной i2c.
+Аппаратные модули (smbus, а для I2C_RDWR - ctypes и fcntl) импортируются только при первом открытии шины.
+"""
+from enum import IntEnum   # для создания нумерованных списков
+import os
+import warnings
+
+
+class I2cTransport(IntEnum):   # способы общения с шиной i2c
+    SMBUS = 0               # через модуль smbus: каждая операция - отдельный вызов, блоки не больше 32 байт
+    RDWR = 1                # напрямую через /dev/i2c-N и ioctl I2C_RDWR: сообщения любой длины за один вызов
+
+
+_busTransport = {}  # номер шины -> выбранный способ общения с ней (по умолчанию SMBUS)
+
+
+def setI2cTransport(transport: I2cTransport, busNum=1):
+    """
+    Выбор способа общения с шиной i2c. Влияет на объекты, созданные после вызова.
+    :param transport: I2cTransport.SMBUS или I2cTransport.RDWR
+    :param busNum: номер шины (/dev/i2c-N)
+    """
+    if not isinstance(transport, I2cTransport):
+        raise ValueError("transport must be set as I2cTransport.* !!")
+    _busTransport[busNum] = transport
+
+
+class _SMBusTransport:
+    """Работа с шиной через модуль smbus"""
+    _maxBlock = 32  # ограничение SMBus на длину блока
+
+    def __init__(self, busNum: int):
+        import smbus    # импортируем только когда шина действительно нужна
+        self._bus = smbus.SMBus(busNum)
+
+    def close(self):
+        self._bus.close()
+
+    def readRaw(self, addr: int, cmd: int, len: int):
+        if len <= self._maxBlock:
+            return self._bus.read_i2c_block_data(addr, cmd, len)
+        result = []     # длинное чтение - кусками по 32 байта с последовательных регистров
+        for i in range(0, len, self._maxBlock):
+            result += self._bus.read_i2c_block_data(addr, cmd + i, min(self._maxBlock, len - i))
+        return result
+
+    def readU8(self, addr: int, register: int):
+        return self._bus.read_byte_data(addr, register)
+
+    def writeByte(self, addr: int, value: int):
+        return self._bus.write_byte(addr, value)
+
+    def writeByteData(self, addr: int, register: int, value: int):
+        self._bus.write_byte_data(addr, register, value)
+
+    def writeList(self, addr: int, register: int, data):
+        for i in range(0, len(data), self._maxBlock):   # длинные данные отправляем кусками по 32 байта
+            self._bus.write_i2c_block_data(addr, register, list(data[i:i + self._maxBlock]))
+
+    def writeBlock(self, addr: int, block):
+        self.writeList(addr, block[0], block[1:])
+
+
+# Константы из linux/i2c-dev.h и linux/i2c.h
+_I2C_FUNCS = 0x0705     # ioctl: получить возможности адаптера
+_I2C_RDWR = 0x0707      # ioctl: выполнить несколько сообщений одной транзакцией
+_I2C_FUNC_I2C = 0x00000001  # адаптер умеет "чистый" i2c (а не только SMBus)
+_I2C_M_RD = 0x0001      # флаг сообщения - чтение
+
+
+ctypes = None   # модули и структуры ядра для I2C_RDWR, загружаются в _loadRdwr()
+fcntl = None
+_I2cMsg = None
+_I2cRdwrData = None
+
+
+def _loadRdwr():
+    """Импорт ctypes и fcntl и описание структур i2c_msg и i2c_rdwr_ioctl_data (один раз)"""
+    global ctypes, fcntl, _I2cMsg, _I2cRdwrData
+    if _I2cMsg is not None:
+        return
+    import ctypes as _ctypes
+    import fcntl as _fcntl
+
+    class I2cMsg(_ctypes.Structure):
+        """struct i2c_msg"""
+        _fields_ = [("addr", _ctypes.c_uint16),
+                    ("flags", _ctypes.c_uint16),
+                    ("len", _ctypes.c_uint16),
+                    ("buf", _ctypes.POINTER(_ctypes.c_uint8))]
+
+    class I2cRdwrData(_ctypes.Structure):
+        """struct i2c_rdwr_ioctl_data"""
+        _fields_ = [("msgs", _ctypes.POINTER(I2cMsg)),
+                    ("nmsgs", _ctypes.c_uint32)]
+
+    ctypes, fcntl = _ctypes, _fcntl
+    _I2cMsg, _I2cRdwrData = I2cMsg, I2cRdwrData
+
+
+class _RdwrTransport:
+    """
+    Работа с шиной через /dev/i2c-N и ioctl I2C_RDWR.
+    Запись любой длины уходит одним сообщением, а чтение регистра (запись адреса + чтение)
+    выполняется одной составной транзакцией - за один системный вызов.
+    """
+    def __init__(self, fd: int):
+        self._fd = fd
+
+    @classmethod
+    def open(cls, busNum: int):
+        """
+        Открывает шину. Возвращает None, если адаптер не поддерживает I2C_FUNC_I2C.
+        :param busNum: номер шины
+        """
+        _loadRdwr()
+        fd = os.open("/dev/i2c-{}".format(busNum), os.O_RDWR)
+        funcs = ctypes.c_ulong()
+        try:
+            fcntl.ioctl(fd, _I2C_FUNCS, funcs)
+        except OSError:
+            funcs.value = 0
+        if not funcs.value & _I2C_FUNC_I2C:
+            os.close(fd)
+            return None
+        return cls(fd)
+
+    def close(self):
+        """Закрытие файла шины (вызывается и при удалении объекта, как у smbus.SMBus)"""
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            os.close(fd)
+
+    def __del__(self):
+        try:
+            self.close()
+        except (OSError, TypeError):    # TypeError - при завершении интерпретатора os уже может быть выгружен
+            pass
+
+    @staticmethod
+    def _msg(addr: int, flags: int, buf):
+        """Заполняет i2c_msg, buf - ctypes массив байт (должен жить до конца транзакции)"""
+        return _I2cMsg(addr, flags, len(buf), ctypes.cast(buf, ctypes.POINTER(ctypes.c_uint8)))
+
+    def _transfer(self, *msgs):
+        """Выполнение сообщений одной транзакцией (с repeated start между ними)"""
+        array = (_I2cMsg * len(msgs))(*msgs)
+        fcntl.ioctl(self._fd, _I2C_RDWR, _I2cRdwrData(array, len(msgs)))
+
+    def readRaw(self, addr: int, cmd: int, len: int):
+        out = (ctypes.c_uint8 * 1)(cmd)
+        result = (ctypes.c_uint8 * len)()
+        self._transfer(self._msg(addr, 0, out), self._msg(addr, _I2C_M_RD, result))
+        return list(result)
+
+    def readU8(self, addr: int, register: int):
+        return self.readRaw(addr, register, 1)[0]
+
+    def writeByte(self, addr: int, value: int):
+        out = (ctypes.c_uint8 * 1)(value & 0xFF)
+        self._transfer(self._msg(addr, 0, out))
+
+    def writeByteData(self, addr: int, register: int, value: int):
+        out = (ctypes.c_uint8 * 2)(register, value)
+        self._transfer(self._msg(addr, 0, out))
+
+    def writeList(self, addr: int, register: int, data):
+        out = bytearray(len(data) + 1)  # байт регистра + данные, одним сообщением
+        out[0] = register
+        out[1:] = data
+        self._transfer(self._msg(addr, 0, (ctypes.c_uint8 * len(out)).from_buffer(out)))
+
+    def writeBlock(self, addr: int, block):
+        if isinstance(block, bytes) or (isinstance(block, memoryview) and block.readonly):
+            buf = (ctypes.c_uint8 * len(block)).from_buffer_copy(block)
+        else:   # изменяемый буфер (bytearray, mmap) передаем в ядро без копирования
+            buf = (ctypes.c_uint8 * len(block)).from_buffer(block)
+        self._transfer(self._msg(addr, 0, buf))
+
+
+def _openTransport(busNum: int):
+    """Создание транспорта для шины в соответствии с выбранным через setI2cTransport способом"""
+    if _busTransport.get(busNum, I2cTransport.SMBUS) == I2cTransport.RDWR:
+        transport = _RdwrTransport.open(busNum)
+        if transport is not None:
+            return transport
+        warnings.warn("Adapter i2c-{} does not support I2C_FUNC_I2C, falling back to SMBus.".format(busNum))
+    return _SMBusTransport(busNum)
+
+
+# Коды операций шины (используются журналом транзакций, см. RPiPWM.record)
+_OP_READ_RAW = 0
+_OP_READ_U8 = 1
+_OP_WRITE_BYTE = 2
+_OP_WRITE_BYTE_DATA = 3
+_OP_WRITE_LIST = 4
+
+_recorder = None    # если задан - каждая транзакция передается ему в record() (см. RPiPWM.record)
+_activityHook = None    # если задана - вызывается с адресом устройства перед каждой транзакцией (см. RPiPWM.power)
+
+
+class _I2c:
+    """Общий служебный класс, с помощью которого реализована работа с I2C"""
+    def __init__(self, busNum=1):
+        self._busNum = busNum
+        self._bus = _openTransport(busNum)
+
+    def close(self):
+        """Закрытие шины. Незакрытая шина закрывается, когда объект удаляется сборщиком мусора"""
+        self._bus.close()
+
+    def readRaw(self, addr: int, cmd: int, len: int):
+        """
+        Чтение "сырых" данных из i2c.
+        Через SMBus больше 32 байт читается кусками, начиная с регистров cmd, cmd + 32 и т.д.
+        :param addr: адрес устройства
+        :param cmd: код комманды
+        :param len: сколько байт считать
+        :return: считанные данные
+        """
+        if _activityHook is not None:
+            _activityHook(addr)
+        result = self._bus.readRaw(addr, cmd, len)
+        if _recorder is not None:
+            _recorder.record(_OP_READ_RAW, self._busNum, addr, cmd, result)
+        return result
+
+    def readU8(self, addr: int, register: int):
+        """
+        Чтение unsigned byte из i2c.
+        :param addr: адрес устройства
+        :param register: регистр для чтения
+        :return: считанные данные
+        """
+        if _activityHook is not None:
+            _activityHook(addr)
+        result = self._bus.readU8(addr, register) & 0xFF
+        if _recorder is not None:
+            _recorder.record(_OP_READ_U8, self._busNum, addr, register, (result,))
+        return result
+
+    def writeByte(self, addr: int, value: int):
+        """
+        Отправка одного байта данных в шину i2c.
+        :param addr: адрес устройства
+        :param value: значение для отправки
+        """
+        if _activityHook is not None:
+            _activityHook(addr)
+        result = self._bus.writeByte(addr, value)
+        if _recorder is not None:   # записываем после транзакции: неотправленное (NACK) в журнал не попадает
+            _recorder.record(_OP_WRITE_BYTE, self._busNum, addr, value & 0xFF, ())
+        return result
+
+    def writeByteData(self, addr: int, register: int, value: int):
+        """
+        Запись одного байта данных в заданный регистр устройства.
+        :param addr: адрес устройства
+        :param register: регистр для записи
+        :param value: значение для записи
+        """
+        value = value & 0xFF
+        if _activityHook is not None:
+            _activityHook(addr)
+        self._bus.writeByteData(addr, register, value)
+        if _recorder is not None:
+            _recorder.record(_OP_WRITE_BYTE_DATA, self._busNum, addr, register, (value,))
+
+    def writeList(self, addr: int, register: int, data: list):
+        """
+        Запись списка байтов в заданный регистр устройства (байт регистра, за ним данные).
+        Через SMBus длинный список отправляется кусками по 32 байта, каждый начинается с того же регистра,
+        через I2C_RDWR - одним сообщением.
+        :param addr: адрес устройства
+        :param register: регистр для записи
+        :param data: список данных
+        """
+        if _activityHook is not None:
+            _activityHook(addr)
+        self._bus.writeList(addr, register, data)
+        if _recorder is not None:
+            _recorder.record(_OP_WRITE_LIST, self._busNum, addr, register, data)
+
+    def writeBlock(self, addr: int, block):
+        """
+        Запись готового блока одной транзакцией: первый байт блока - регистр, остальные - данные.
+        Через I2C_RDWR изменяемый буфер (bytearray, mmap) уходит в ядро без копирования.
+        :param addr: адрес устройства
+        :param block: bytes, bytearray или memoryview
+        """
+        if _activityHook is not None:
+            _activityHook(addr)
+        self._bus.writeBlock(addr, block)
+        if _recorder is not None:
+            _recorder.record(_OP_WRITE_LIST, self._busNum, addr, block[0], block[1:])
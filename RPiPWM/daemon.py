@@ -0,0 +1,521 @@
+"""
+Демон-владелец шины: позволяет нескольким процессам одновременно работать с PCA9685, дисплеем и АЦП.
+
+Демон единственный создает объекты устройств и общается с шиной, поэтому микросхема не
+переинициализируется при запуске каждого процесса, а транзакции разных процессов не перемешиваются.
+Клиенты подключаются через Unix-сокет и получают объекты-заместители с тем же набором методов,
+что у PwmBase, классов дисплея и Battery. Протокол - JSON, одна строка на запрос:
+    {"calls": [[объект, метод, [аргументы]], ...]}  ->  {"results": [...]} или {"error": ..., "type": ...}
+Все вызовы одного запроса выполняются подряд, без вмешательства других клиентов.
+
+Кроме того, демон публикует значения каналов и отфильтрованное напряжение в разделяемой памяти,
+и клиенты читают их без обращения к демону.
+
+Запуск демона:
+    python3 -m RPiPWM.daemon [--socket /tmp/rpipwm.sock] [--shm /dev/shm/rpipwm]
+"""
+import argparse
+import fcntl
+import json
+import math
+import mmap
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+from . import pwm as _pwm
+from . import display as _display
+from .adc import Battery
+from .display import _imageToPages
+
+DEFAULT_SOCKET = "/tmp/rpipwm.sock"
+DEFAULT_SHM = "/dev/shm/rpipwm"
+
+# разделяемая память: счетчик версии (нечетный - идет запись), значения 16 каналов (NaN - канал не занят), напряжение
+_SNAPSHOT = struct.Struct("<I16dd")
+_SEQ = struct.Struct("<I")
+_VALUES = struct.Struct("<16dd")
+
+_PWM_CLASSES = {
+    "Servo90": _pwm.Servo90,
+    "Servo120": _pwm.Servo120,
+    "Servo180": _pwm.Servo180,
+    "Servo270": _pwm.Servo270,
+    "ForwardMotor": _pwm.ForwardMotor,
+    "ReverseMotor": _pwm.ReverseMotor,
+    "Switch": _pwm.Switch,
+}
+_DISPLAY_CLASSES = {
+    "SSD1306_128_64": _display.SSD1306_128_64,
+    "SSD1306_128_32": _display.SSD1306_128_32,
+    "SSD1306_96_16": _display.SSD1306_96_16,
+}
+_DISPLAY_SIZES = {
+    "SSD1306_128_64": (128, 64),
+    "SSD1306_128_32": (128, 32),
+    "SSD1306_96_16": (96, 16),
+}
+
+# методы, которые клиент может вызывать у объектов демона
+_PWM_METHODS = ("setValue", "getValue", "setMcs", "getMcs")
+_DISPLAY_METHODS = ("begin", "getSize", "display", "clear", "setBrightness")
+_BATTERY_METHODS = ("getVoltageInstant", "getVoltageFiltered", "calibrate")
+
+# ошибки, которые передаются клиенту с тем же типом
+_ERRORS = {error.__name__: error for error in (ValueError, TypeError, KeyError, RuntimeError)}
+
+
+class _Snapshot:
+    """
+    Снимок состояния в разделяемой памяти (файл в /dev/shm, отображенный через mmap).
+    Запись защищена счетчиком версии (seqlock): читатель повторяет чтение, если во время него шла запись.
+    """
+    def __init__(self, path: str, create=False):
+        if create:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+            os.ftruncate(fd, _SNAPSHOT.size)
+        else:
+            fd = os.open(path, os.O_RDONLY)
+        try:
+            self._map = mmap.mmap(fd, _SNAPSHOT.size, access=mmap.ACCESS_WRITE if create else mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        if create:
+            self._seq = 0
+            self._values = [math.nan]*16
+            self._voltage = math.nan
+            self._publish()
+
+    def _publish(self):
+        """Запись состояния (только у демона, вызывается под его блокировкой)"""
+        self._seq += 1      # нечетное - запись началась
+        _SEQ.pack_into(self._map, 0, self._seq)
+        _VALUES.pack_into(self._map, _SEQ.size, *self._values, self._voltage)
+        self._seq += 1      # четное - запись закончена, пишется только после данных
+        _SEQ.pack_into(self._map, 0, self._seq)
+
+    def setValue(self, channel: int, value):
+        self._values[channel] = float(value)
+        self._publish()
+
+    def setVoltage(self, voltage: float):
+        self._voltage = float(voltage)
+        self._publish()
+
+    def read(self, timeout=0.1):
+        """
+        Согласованное чтение снимка.
+        :param timeout: сколько секунд повторять чтение, пока идет запись (счетчик может остаться нечетным,
+        если демон завершился посреди записи)
+        :return: список значений 16 каналов (NaN - канал не занят), отфильтрованное напряжение
+        """
+        deadline = None
+        while True:
+            seq = _SEQ.unpack_from(self._map, 0)[0]
+            if not seq & 1:     # нечетное - демон как раз пишет
+                data = _VALUES.unpack_from(self._map, _SEQ.size)
+                if _SEQ.unpack_from(self._map, 0)[0] == seq:    # за время чтения запись не начиналась
+                    return list(data[:16]), data[16]
+            if deadline is None:
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() > deadline:
+                raise RuntimeError("Shared memory snapshot is not consistent, is the daemon alive?")
+            time.sleep(0)   # отдаем процессор пишущему
+
+    def close(self):
+        self._map.close()
+
+
+class BusDaemon:
+    """Демон, который владеет шиной и устройствами и выполняет запросы клиентов"""
+    def __init__(self, socketPath=DEFAULT_SOCKET, shmPath=DEFAULT_SHM, vRef=3.3, gain=7.66, voltagePeriod=0.05,
+                 attach=False):
+        """
+        Конструктор класса
+        :param socketPath: путь к Unix-сокету
+        :param shmPath: путь к файлу разделяемой памяти
+        :param vRef: опорное напряжение АЦП (см. Battery)
+        :param gain: коэффициент делителя напряжения (см. Battery)
+        :param voltagePeriod: как часто публиковать отфильтрованное напряжение, с
+        :param attach: подключаться к уже работающей PCA9685 без переинициализации (см. PwmBase)
+        """
+        self._socketPath = socketPath
+        self._attach = attach
+        self._vRef = vRef
+        self._gain = gain
+        self._shmPath = shmPath
+        self._voltagePeriod = voltagePeriod
+        self._lock = threading.Lock()   # шиной в каждый момент пользуется только один запрос
+        self._pwm = {}          # номер канала -> ((имя класса, частота, расширенный диапазон), объект)
+        self._display = None    # (имя класса, объект)
+        self._battery = None
+        self._snapshot = None
+        self._server = None
+
+    def _getBattery(self):
+        if self._battery is None:
+            self._battery = Battery(vRef=self._vRef, gain=self._gain)
+            self._battery.start()
+        return self._battery
+
+    def _open(self, kind: str, args: list):
+        """Создание (или получение уже созданного) устройства. Возвращает ключ объекта для вызовов."""
+        if kind in _PWM_CLASSES:
+            channel, freq, extended = args
+            params = (kind, int(freq), bool(extended))
+            opened = self._pwm.get(channel)
+            if opened is None:
+                device = _PWM_CLASSES[kind](channel, freq=_pwm.PwmFreq(freq), extended=bool(extended),
+                                            attach=self._attach)
+                self._pwm[channel] = (params, device)
+                self._snapshot.setValue(channel, device.getValue())
+            elif opened[0][0] != kind:
+                raise ValueError("This channel is already used!")
+            elif opened[0] != params:   # иначе одно и то же значение у клиентов давало бы разную длительность импульса
+                raise ValueError("Channel {} is already opened with freq={}, extended={}".format(
+                    channel, opened[0][1], opened[0][2]))
+            return "pwm:{}".format(channel)
+        if kind in _DISPLAY_CLASSES:
+            if self._display is None:
+                self._display = (kind, _DISPLAY_CLASSES[kind]())
+            elif self._display[0] != kind:
+                raise ValueError("Display is already opened as {}".format(self._display[0]))
+            return "display"
+        if kind == "Battery":
+            self._getBattery()
+            return "battery"
+        raise ValueError("Unknown device: {}".format(kind))
+
+    def _call(self, key: str, method: str, args: list):
+        """Выполнение одного вызова"""
+        if key == "daemon":
+            if method != "open":
+                raise ValueError("Unknown daemon method: {}".format(method))
+            return self._open(args[0], args[1:])
+        if key.startswith("pwm:"):
+            channel = int(key[4:])
+            if channel not in self._pwm or method not in _PWM_METHODS:
+                raise ValueError("Bad call: {}.{}".format(key, method))
+            device = self._pwm[channel][1]
+            result = getattr(device, method)(*args)
+            if method.startswith("set"):
+                self._snapshot.setValue(channel, device.getValue())
+            return result
+        if key == "display":
+            if self._display is None:
+                raise ValueError("Display is not opened")
+            device = self._display[1]
+            if method == "show":    # буфер, подготовленный клиентом (hex), и вывод на экран
+                device._setBuffer(bytes.fromhex(args[0]))
+                device.display()
+                return None
+            if method not in _DISPLAY_METHODS:
+                raise ValueError("Bad call: display.{}".format(method))
+            return getattr(device, method)(*args)
+        if key == "battery":
+            if method not in _BATTERY_METHODS:
+                raise ValueError("Bad call: battery.{}".format(method))
+            return getattr(self._getBattery(), method)(*args)
+        raise ValueError("Unknown object: {}".format(key))
+
+    def handle(self, request: dict):
+        """Выполнение запроса (пакета вызовов) целиком под блокировкой шины"""
+        results = []
+        with self._lock:
+            for index, (key, method, args) in enumerate(request["calls"]):
+                try:
+                    results.append(self._call(key, method, args))
+                except Exception as e:
+                    return {"error": str(e), "type": type(e).__name__, "index": index, "results": results}
+        return {"results": results}
+
+    def _publishVoltage(self):
+        """Поток, который периодически публикует отфильтрованное напряжение"""
+        while self._server is not None:
+            if self._battery is not None:
+                with self._lock:
+                    self._snapshot.setVoltage(self._battery.getVoltageFiltered())
+            time.sleep(self._voltagePeriod)
+
+    def _lockOrFail(self):
+        """
+        Захват файла-блокировки рядом с сокетом, чтобы второй демон не забрал сокет и не обнулил снимок у первого.
+        :return: дескриптор файла-блокировки (держится открытым, пока демон работает)
+        """
+        fd = os.open(self._socketPath + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            raise RuntimeError("Another daemon is already running on {}".format(self._socketPath))
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:    # демон без блокировки (например, старой версии) - на сокете кто-то отвечает
+            probe.connect(self._socketPath)
+        except OSError:
+            pass
+        else:
+            os.close(fd)
+            raise RuntimeError("Another daemon is already running on {}".format(self._socketPath))
+        finally:
+            probe.close()
+        return fd
+
+    def serveForever(self):
+        """Запуск демона (блокирует до вызова shutdown)"""
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        response = daemon.handle(json.loads(line))
+                    except (ValueError, KeyError, TypeError) as e:
+                        response = {"error": "Bad request: {}".format(e), "type": "ValueError", "results": []}
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+                    self.wfile.flush()
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        lockFd = self._lockOrFail()
+        try:
+            if os.path.exists(self._socketPath):    # сокет от прошлого запуска (демон с ним уже не работает)
+                os.unlink(self._socketPath)
+            self._snapshot = _Snapshot(self._shmPath, create=True)
+            self._server = Server(self._socketPath, Handler)
+            socketIno = os.stat(self._socketPath).st_ino
+            threading.Thread(target=self._publishVoltage, daemon=True).start()
+            try:
+                self._server.serve_forever()
+            finally:
+                self._server.server_close()
+                self._server = None
+                try:    # удаляем только свой сокет
+                    if os.stat(self._socketPath).st_ino == socketIno:
+                        os.unlink(self._socketPath)
+                except FileNotFoundError:
+                    pass
+        finally:
+            os.close(lockFd)    # блокировка снимается вместе с закрытием файла
+
+    def shutdown(self):
+        """Остановка демона (из другого потока)"""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+class DaemonClient:
+    """
+    Подключение к демону. Создает объекты-заместители:
+    client.Servo180(1), client.SSD1306_128_64(), client.Battery() и т.д.
+    """
+    def __init__(self, socketPath=DEFAULT_SOCKET, shmPath=DEFAULT_SHM):
+        """
+        Конструктор класса
+        :param socketPath: путь к Unix-сокету демона
+        :param shmPath: путь к файлу разделяемой памяти демона
+        """
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(socketPath)
+        self._file = self._socket.makefile("rwb")
+        self._lock = threading.Lock()
+        self._local = threading.local()     # текущий пакет вызовов (у каждого потока свой)
+        self._snapshot = _Snapshot(shmPath)
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+        self._snapshot.close()
+
+    def _request(self, calls: list):
+        """Отправка пакета вызовов и получение результатов"""
+        with self._lock:
+            self._file.write(json.dumps({"calls": calls}).encode() + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise _ERRORS.get(response["type"], RuntimeError)(response["error"])
+        return response["results"]
+
+    def call(self, key: str, method: str, *args):
+        """Вызов метода объекта демона. Внутри batch() вызов откладывается и возвращает None."""
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            batch.append([key, method, list(args)])
+            return None
+        return self._request([[key, method, list(args)]])[0]
+
+    def batch(self):
+        """
+        Пакет вызовов: все вызовы внутри блока with уходят демону одним запросом и выполняются подряд.
+        with client.batch() as results:
+            servo1.setValue(10)
+            servo2.setValue(20)
+        print(results)  # результаты вызовов в том же порядке
+        """
+        return _Batch(self)
+
+    def snapshot(self):
+        """
+        Значения каналов и напряжение из разделяемой памяти (без обращения к демону).
+        :return: список значений 16 каналов (NaN - канал не занят), отфильтрованное напряжение
+        """
+        return self._snapshot.read()
+
+    def _openPwm(self, kind, channel, freq, extended):
+        key = self.call("daemon", "open", kind, channel, int(freq), bool(extended))
+        return PwmProxy(self, key, channel, kind)
+
+    def Servo90(self, channel, freq=_pwm.PwmFreq.H50, extended=False):
+        return self._openPwm("Servo90", channel, freq, extended)
+
+    def Servo120(self, channel, freq=_pwm.PwmFreq.H50, extended=False):
+        return self._openPwm("Servo120", channel, freq, extended)
+
+    def Servo180(self, channel, freq=_pwm.PwmFreq.H50, extended=False):
+        return self._openPwm("Servo180", channel, freq, extended)
+
+    def Servo270(self, channel, freq=_pwm.PwmFreq.H50, extended=False):
+        return self._openPwm("Servo270", channel, freq, extended)
+
+    def ForwardMotor(self, channel, freq=_pwm.PwmFreq.H50, extended=False):
+        return self._openPwm("ForwardMotor", channel, freq, extended)
+
+    def ReverseMotor(self, channel, freq=_pwm.PwmFreq.H50, extended=False):
+        return self._openPwm("ReverseMotor", channel, freq, extended)
+
+    def Switch(self, channel, freq=_pwm.PwmFreq.H50, extended=False):
+        return self._openPwm("Switch", channel, freq, extended)
+
+    def _openDisplay(self, kind):
+        self.call("daemon", "open", kind)
+        return DisplayProxy(self, *_DISPLAY_SIZES[kind])
+
+    def SSD1306_128_64(self):
+        return self._openDisplay("SSD1306_128_64")
+
+    def SSD1306_128_32(self):
+        return self._openDisplay("SSD1306_128_32")
+
+    def SSD1306_96_16(self):
+        return self._openDisplay("SSD1306_96_16")
+
+    def Battery(self, vRef=3.3, gain=7.66):
+        """Параметры vRef и gain задаются при запуске демона, здесь оставлены для совместимости"""
+        self.call("daemon", "open", "Battery")
+        return BatteryProxy(self)
+
+
+class _Batch:
+    """Контекст пакета вызовов (см. DaemonClient.batch)"""
+    def __init__(self, client: DaemonClient):
+        self._client = client
+        self._results = []
+
+    def __enter__(self):
+        if getattr(self._client._local, "batch", None) is not None:
+            raise RuntimeError("Batches can not be nested")
+        self._client._local.batch = []
+        return self._results
+
+    def __exit__(self, excType, exc, tb):
+        calls, self._client._local.batch = self._client._local.batch, None
+        if excType is None and calls:
+            self._results.extend(self._client._request(calls))
+
+
+class PwmProxy:
+    """Заместитель канала ШИМ, методы как у PwmBase"""
+    def __init__(self, client: DaemonClient, key: str, channel: int, kind: str):
+        self._client = client
+        self._key = key
+        self._channel = channel
+        self._kind = kind   # имя класса устройства (см. _PWM_CLASSES)
+
+    def setValue(self, value):
+        self._client.call(self._key, "setValue", value)
+
+    def setMcs(self, value):
+        self._client.call(self._key, "setMcs", value)
+
+    def getMcs(self):
+        return self._client.call(self._key, "getMcs")
+
+    def getValue(self):
+        """Последнее установленное значение - из разделяемой памяти, без обращения к демону"""
+        value = self._client.snapshot()[0][self._channel]
+        if self._kind == "Switch":  # как у PwmBase: вкл/выкл хранится как bool
+            return bool(value)
+        return int(value) if value.is_integer() else value
+
+
+class DisplayProxy:
+    """Заместитель дисплея, методы как у классов SSD1306. Картинка преобразуется на стороне клиента."""
+    def __init__(self, client: DaemonClient, width: int, height: int):
+        self._client = client
+        self._width = width
+        self._height = height
+        self._buffer = bytes(width * (height // 8))
+
+    def getSize(self):
+        return self._width, self._height
+
+    def begin(self, vccstate=_display._SSD1306_SWITCHCAPVCC):
+        self._client.call("display", "begin", vccstate)
+
+    def image(self, image):
+        self._buffer = bytes(_imageToPages(image, self._width, self._height))
+
+    def clear(self):
+        self._buffer = bytes(len(self._buffer))
+
+    def display(self):
+        self._client.call("display", "show", self._buffer.hex())
+
+    def setBrightness(self, contrast: int):
+        if contrast < 0 or contrast > 255:
+            raise ValueError('Contrast must be value from 0 to 255 (inclusive).')
+        self._client.call("display", "setBrightness", contrast)
+
+
+class BatteryProxy:
+    """Заместитель АЦП, методы как у Battery. Измерения в фоне ведет демон."""
+    def __init__(self, client: DaemonClient):
+        self._client = client
+
+    def start(self):
+        """Измерения уже идут в демоне - ничего не делаем"""
+
+    def stop(self):
+        """Измерения ведет демон - ничего не делаем"""
+
+    def getVoltageInstant(self):
+        return self._client.call("battery", "getVoltageInstant")
+
+    def getVoltageFiltered(self):
+        """Отфильтрованное напряжение - из разделяемой памяти, без обращения к демону"""
+        return round(self._client.snapshot()[1], 2)
+
+    def calibrate(self, exactVoltage: float):
+        self._client.call("battery", "calibrate", exactVoltage)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RPiPWM bus-owner daemon")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    parser.add_argument("--shm", default=DEFAULT_SHM, help="shared memory snapshot path")
+    parser.add_argument("--vref", type=float, default=3.3, help="ADC reference voltage")
+    parser.add_argument("--gain", type=float, default=7.66, help="battery voltage divider gain")
+    parser.add_argument("--attach", action="store_true", help="adopt the state of an already running PCA9685")
+    args = parser.parse_args(argv)
+    BusDaemon(args.socket, args.shm, vRef=args.vref, gain=args.gain, attach=args.attach).serveForever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+from .bus import _I2c
+
+
+'''
+Классы для работы с дисплеем.
+'''
+# Регистры для работы с SSD1306
+_SSD1306_I2C_ADDRESS = 0x3C    # 011110+SA0+RW - 0x3C or 0x3D
+_SSD1306_SETCONTRAST = 0x81
+_SSD1306_DISPLAYALLON_RESUME = 0xA4
+_SSD1306_DISPLAYALLON = 0xA5
+_SSD1306_NORMALDISPLAY = 0xA6
+_SSD1306_INVERTDISPLAY = 0xA7
+_SSD1306_DISPLAYOFF = 0xAE
+_SSD1306_DISPLAYON = 0xAF
+_SSD1306_SETDISPLAYOFFSET = 0xD3
+_SSD1306_SETCOMPINS = 0xDA
+_SSD1306_SETVCOMDETECT = 0xDB
+_SSD1306_SETDISPLAYCLOCKDIV = 0xD5
+_SSD1306_SETPRECHARGE = 0xD9
+_SSD1306_SETMULTIPLEX = 0xA8
+_SSD1306_SETLOWCOLUMN = 0x00
+_SSD1306_SETHIGHCOLUMN = 0x10
+_SSD1306_SETSTARTLINE = 0x40
+_SSD1306_MEMORYMODE = 0x20
+_SSD1306_COLUMNADDR = 0x21
+_SSD1306_PAGEADDR = 0x22
+_SSD1306_COMSCANINC = 0xC0
+_SSD1306_COMSCANDEC = 0xC8
+_SSD1306_SEGREMAP = 0xA0
+_SSD1306_CHARGEPUMP = 0x8D
+_SSD1306_EXTERNALVCC = 0x1
+_SSD1306_SWITCHCAPVCC = 0x2
+# Константы для работы с прокруткой дисплея
+_SSD1306_ACTIVATE_SCROLL = 0x2F
+_SSD1306_DEACTIVATE_SCROLL = 0x2E
+_SSD1306_SET_VERTICAL_SCROLL_AREA = 0xA3
+_SSD1306_RIGHT_HORIZONTAL_SCROLL = 0x26
+_SSD1306_LEFT_HORIZONTAL_SCROLL = 0x27
+_SSD1306_VERTICAL_AND_RIGHT_HORIZONTAL_SCROLL = 0x29
+_SSD1306_VERTICAL_AND_LEFT_HORIZONTAL_SCROLL = 0x2A
+
+
+def _imageToPages(image, width: int, height: int):
+    """
+    Преобразование картинки PIL в формат памяти дисплея: страницы по 8 строк, в каждой странице по байту
+    на столбец, младший бит - верхняя строка страницы.
+    :param image: картинка в режиме mode = 1 размером width x height
+    :return: список байтов длиной width * height // 8
+    """
+    if image.mode != '1':
+        raise ValueError('image must be in mode 1.')
+    imWidth, imHeight = image.size
+    if imWidth != width or imHeight != height:
+        raise ValueError('image must be same dimensions as display ({0}x{1})'.format(width, height))
+    pix = image.load()  # выгружаем пиксели из картинки
+    buffer = [0]*(width*(height//8))
+    # проходим через память чтобы записать картинку в буффер
+    index = 0
+    for page in range(height//8):
+        # идем по оси x (колонны)
+        for x in range(width):
+            bits = 0
+            for bit in [0, 1, 2, 3, 4, 5, 6, 7]:    # быстрее чем range
+                bits = bits << 1
+                bits |= 0 if pix[(x, page*8 + 7 - bit)] == 0 else 1
+            # обновляем буффер и увеличиваем счетчик
+            buffer[index] = bits
+            index += 1
+    return buffer
+
+
+class _SSD1306Base(object):
+    """Базовый класс для работы с OLED дисплеями на базе SSD1306"""
+    def __init__(self, width, height):
+        """
+        Конструктор класса
+        :param width: ширина дисплея, в пикселях
+        :param height: высота дисплея, в пикселях
+        """
+        self._width = width  # ширина и высота дисплея
+        self._height = height
+        self._pages = height//8     # строки дисплея
+        self._buffer = [0]*(width*self._pages)  # буффер изображения (из нулей)
+        self._i2c = _I2c()
+
+    def _initialize(self):
+        """Инициализация дисплея"""
+        raise NotImplementedError
+
+    def _command(self, c: int):
+        """Отправка байта команды дисплею"""
+        control = 0x00
+        self._i2c.writeByteData(_SSD1306_I2C_ADDRESS, control, c)
+
+    def _commandList(self, cmds: list):
+        """Отправка нескольких команд дисплею одной транзакцией"""
+        control = 0x00
+        self._i2c.writeList(_SSD1306_I2C_ADDRESS, control, cmds)
+
+    def _data(self, c: int):  # Отправка байта данных дисплею
+        """Отправка байта данных дисплею"""
+        control = 0x40
+        self._i2c.writeByteData(_SSD1306_I2C_ADDRESS, control, c)
+
+    def getSize(self):
+        """
+        Возвращает ширину и высоту дисплея
+        :return: width, height
+        """
+        return self._width, self._height
+
+    def begin(self, vccstate=_SSD1306_SWITCHCAPVCC):
+        """Включение дисплея"""
+        self._vccstate = vccstate
+        self._initialize()
+        self._command(_SSD1306_DISPLAYON)
+
+    def display(self):
+        """Вывод программного буфера дисплея на физическое устройство"""
+        self._commandList([_SSD1306_COLUMNADDR,     # задаем нумерацию столбцов
+                           0,                       # Начало столбцов (0 = сброс)
+                           self._width - 1,         # адрес последнего столбца
+                           _SSD1306_PAGEADDR,       # задаем адрес страниц (строк)
+                           0,                       # Начало строк (0 = сброс)
+                           self._pages - 1])        # адрес последней строки
+
+        control = 0x40  # Выводим буффер данных (транспорт сам разобьет его, если нужно)
+        self._i2c.writeList(_SSD1306_I2C_ADDRESS, control, self._buffer)
+
+    def image(self, image):
+        """
+        Вывод картинки, созданной с помощью библиотеки PIL
+        :param image: картинка должна быть в режиме mode = 1 и совпадать по размеру с дисплеем
+        """
+        self._buffer = _imageToPages(image, self._width, self._height)
+
+    def _setBuffer(self, data):
+        """Запись уже подготовленных данных (в формате памяти дисплея) в буффер"""
+        if len(data) != len(self._buffer):
+            raise ValueError('buffer must be {0} bytes long'.format(len(self._buffer)))
+        self._buffer = list(data)
+
+    def clear(self):
+        """Очистка буффера изображения"""
+        self._buffer = [0]*(self._width * self._pages)
+
+    def setBrightness(self, contrast: int):    # установка яркости дисплея от 0 до 255
+        """
+        Установка яркости дисплея
+        :param contrast: значение от 0 до 255
+        """
+        if contrast < 0 or contrast > 255:
+            raise ValueError('Contrast must be value from 0 to 255 (inclusive).')
+        self._command(_SSD1306_SETCONTRAST)
+        self._command(contrast)
+
+    # ИМХО - бесполезная функция, когда есть предыдущая
+    def _Dim(self, dim: bool):
+        """
+        Подстройка значения яркости.
+        :param dim: True - значение в зависимости от источника питания. False - минимальная яркость
+        :return:
+        """
+        contrast = 0
+        if not dim:
+            if self._vccstate == _SSD1306_EXTERNALVCC:
+                contrast = 0x9F
+            else:
+                contrast = 0xCF
+        self.setBrightness(contrast)
+
+
+class SSD1306_128_64(_SSD1306Base):
+    """Класс для дисплея 128x64 pix"""
+    def __init__(self):
+        # вызываем конструктор класса
+        super(SSD1306_128_64, self).__init__(128, 64)
+
+    def _initialize(self):
+        """Инициализация для дисплея размером 128x64"""
+        self._command(_SSD1306_DISPLAYOFF)           # 0xAE
+        self._command(_SSD1306_SETDISPLAYCLOCKDIV)   # 0xD5
+        self._command(0x80)                          # предлагаемоое соотношение 0x80
+        self._command(_SSD1306_SETMULTIPLEX)         # 0xA8
+        self._command(0x3F)
+        self._command(_SSD1306_SETDISPLAYOFFSET)     # 0xD3
+        self._command(0x0)                           # без отступов
+        self._command(_SSD1306_SETSTARTLINE | 0x0)   # начинаем строки с 0
+        self._command(_SSD1306_CHARGEPUMP)           # 0x8D
+        if self._vccstate == _SSD1306_EXTERNALVCC:
+            self._command(0x10)
+        else:
+            self._command(0x14)
+        self._command(_SSD1306_MEMORYMODE)           # 0x20
+        self._command(0x00)                          # иначе работает неправильно (0x0 act like ks0108)
+        self._command(_SSD1306_SEGREMAP | 0x1)
+        self._command(_SSD1306_COMSCANDEC)
+        self._command(_SSD1306_SETCOMPINS)           # 0xDA
+        self._command(0x12)
+        self._command(_SSD1306_SETCONTRAST)          # 0x81
+        if self._vccstate == _SSD1306_EXTERNALVCC:
+            self._command(0x9F)
+        else:
+            self._command(0xCF)
+        self._command(_SSD1306_SETPRECHARGE)         # 0xd9
+        if self._vccstate == _SSD1306_EXTERNALVCC:
+            self._command(0x22)
+        else:
+            self._command(0xF1)
+        self._command(_SSD1306_SETVCOMDETECT)        # 0xDB
+        self._command(0x40)
+        self._command(_SSD1306_DISPLAYALLON_RESUME)  # 0xA4
+        self._command(_SSD1306_NORMALDISPLAY)        # 0xA6
+
+
+class SSD1306_128_32(_SSD1306Base):  # класс для дисплея 128*32 pix
+    """Класс для дисплея 128x32 pix"""
+    def __init__(self):
+        # Вызываем конструктор класса
+        super(SSD1306_128_32, self).__init__(128, 32)
+
+    def _initialize(self):
+        """Инициализация для дисплея размером 128x32"""
+        self._command(_SSD1306_DISPLAYOFF)           # 0xAE
+        self._command(_SSD1306_SETDISPLAYCLOCKDIV)   # 0xD5
+        self._command(0x80)                          # предлагаемоое соотношение 0x80
+        self._command(_SSD1306_SETMULTIPLEX)         # 0xA8
+        self._command(0x1F)
+        self._command(_SSD1306_SETDISPLAYOFFSET)     # 0xD3
+        self._command(0x0)                           # без отступов
+        self._command(_SSD1306_SETSTARTLINE | 0x0)   # начинаем строки с 0
+        self._command(_SSD1306_CHARGEPUMP)           # 0x8D
+        if self._vccstate == _SSD1306_EXTERNALVCC:
+            self._command(0x10)
+        else:
+            self._command(0x14)
+        self._command(_SSD1306_MEMORYMODE)           # 0x20
+        self._command(0x00)                          # иначе работает неправильно (0x0 act like ks0108)
+        self._command(_SSD1306_SEGREMAP | 0x1)
+        self._command(_SSD1306_COMSCANDEC)
+        self._command(_SSD1306_SETCOMPINS)           # 0xDA
+        self._command(0x02)
+        self._command(_SSD1306_SETCONTRAST)          # 0x81
+        self._command(0x8F)
+        self._command(_SSD1306_SETPRECHARGE)         # 0xd9
+        if self._vccstate == _SSD1306_EXTERNALVCC:
+            self._command(0x22)
+        else:
+            self._command(0xF1)
+        self._command(_SSD1306_SETVCOMDETECT)        # 0xDB
+        self._command(0x40)
+        self._command(_SSD1306_DISPLAYALLON_RESUME)  # 0xA4
+        self._command(_SSD1306_NORMALDISPLAY)        # 0xA6
+
+
+class SSD1306_96_16(_SSD1306Base):
+    """Класс для дисплея 96x16 pix"""
+    def __init__(self):
+        # Вызываем конструктор класса
+        super(SSD1306_96_16, self).__init__(96, 16)
+
+    def _initialize(self):
+        """Инициализация для дисплея размером 96x16"""
+        self._command(_SSD1306_DISPLAYOFF)           # 0xAE
+        self._command(_SSD1306_SETDISPLAYCLOCKDIV)   # 0xD5
+        self._command(0x60)                          # предлагаемоое соотношение 0x60
+        self._command(_SSD1306_SETMULTIPLEX)         # 0xA8
+        self._command(0x0F)
+        self._command(_SSD1306_SETDISPLAYOFFSET)     # 0xD3
+        self._command(0x0)                           # без отступов
+        self._command(_SSD1306_SETSTARTLINE | 0x0)   # начинаем строки с 0
+        self._command(_SSD1306_CHARGEPUMP)           # 0x8D
+        if self._vccstate == _SSD1306_EXTERNALVCC:
+            self._command(0x10)
+        else:
+            self._command(0x14)
+        self._command(_SSD1306_MEMORYMODE)           # 0x20
+        self._command(0x00)                          # иначе работает неправильно (0x0 act like ks0108)
+        self._command(_SSD1306_SEGREMAP | 0x1)
+        self._command(_SSD1306_COMSCANDEC)
+        self._command(_SSD1306_SETCOMPINS)           # 0xDA
+        self._command(0x02)
+        self._command(_SSD1306_SETCONTRAST)          # 0x81
+        self._command(0x8F)
+        self._command(_SSD1306_SETPRECHARGE)         # 0xd9
+        if self._vccstate == _SSD1306_EXTERNALVCC:
+            self._command(0x22)
+        else:
+            self._command(0xF1)
+        self._command(_SSD1306_SETVCOMDETECT)        # 0xDB
+        self._command(0x40)
+        self._command(_SSD1306_DISPLAYALLON_RESUME)  # 0xA4
+        self._command(_SSD1306_NORMALDISPLAY)        # 0xA6
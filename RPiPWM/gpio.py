@@ -0,0 +1,422 @@
+import time
+import threading
+import queue
+from collections import namedtuple
+from enum import IntEnum   # для создания нумерованных списков
+
+
+'''
+Класс для работы с кнопкой и светодиодом.
+При создании класса инициализируются пины.
+'''
+_chanButton = 20    # пины по умолчанию, возможно в будущем будут меняться
+_chanLed = 21
+
+GPIO = None     # модуль RPi.GPIO, импортируется при создании первого объекта Gpio
+
+
+def _loadGpio():
+    """Импорт RPi.GPIO при первом обращении"""
+    global GPIO
+    if GPIO is None:
+        import RPi.GPIO
+        GPIO = RPi.GPIO
+    return GPIO
+
+
+class ButtonEventType(IntEnum):     # список событий кнопки
+    PRESS = 0           # кнопка нажата
+    RELEASE = 1         # кнопка отпущена
+    LONG_PRESS = 2      # кнопку держат дольше longPressTime
+    DOUBLE_CLICK = 3    # второе нажатие в течение doubleClickTime после отпускания
+
+
+# событие кнопки: тип, номер пина, момент времени (time.monotonic()) и длительность нажатия (для RELEASE и LONG_PRESS)
+ButtonEvent = namedtuple("ButtonEvent", ["type", "channel", "timestamp", "duration"])
+
+
+class _ButtonDispatcher(threading.Thread):
+    """
+    Обработка событий кнопки в отдельном потоке.
+    Обработчик фронта от RPi.GPIO только запоминает время и уровень и кладет их в очередь,
+    а подавление дребезга, распознавание событий и вызов пользовательских функций происходят здесь,
+    поэтому медленная функция не блокирует поток RPi.GPIO и следующие нажатия не теряются.
+    """
+    def __init__(self, channel: int, debounce: float, longPressTime: float, doubleClickTime: float,
+                 workers: int, queueSize: int):
+        threading.Thread.__init__(self, daemon=True)
+        self._channel = channel
+        self._debounce = debounce
+        self._longPressTime = longPressTime
+        self._doubleClickTime = doubleClickTime
+        self._edges = queue.SimpleQueue()    # сырые фронты: (время, уровень), None - завершение
+        self._events = queue.Queue(maxsize=queueSize)    # события для опроса через getEvent
+        self._callbacks = {eventType: [] for eventType in ButtonEventType}
+        self._subscribers = []   # асинхронные потребители: (цикл asyncio, asyncio.Queue)
+        self._lock = threading.Lock()
+        self._pool = None   # 0 обработчиков - вызываем функции прямо здесь
+        if workers > 0:
+            from concurrent.futures import ThreadPoolExecutor  # модуль тяжелый - только когда пул нужен
+            self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._pressed = False       # текущее (отфильтрованное) состояние кнопки
+        self._pressTime = 0         # когда кнопку нажали
+        self._lastRelease = None    # когда отпустили кнопку после первого нажатия (для двойного нажатия)
+        self._secondClick = False   # текущее нажатие - второе в двойном
+        self._settleDeadline = None     # до этого момента фронты считаются дребезгом
+        self._longPressDeadline = None  # когда сработает долгое нажатие
+
+    def onEdge(self, channel):
+        """Обработчик фронта, вызывается в потоке RPi.GPIO. Должен быть максимально быстрым."""
+        self._edges.put((time.monotonic(), GPIO.input(channel)))
+
+    def stop(self):
+        """
+        Остановка потока: фронты, пришедшие до остановки, еще разбираются, и только после этого
+        закрывается пул (уже поставленные в пул функции доработают)
+        """
+        self._edges.put(None)
+        if self.is_alive() and threading.current_thread() is not self:     # stop мог вызвать обработчик кнопки
+            self.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+    def addCallback(self, eventType: ButtonEventType, foo):
+        with self._lock:
+            self._callbacks[eventType].append(foo)
+
+    def getEvent(self, timeout=None):
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def subscribe(self, loop, asyncQueue):
+        with self._lock:
+            self._subscribers.append((loop, asyncQueue))
+
+    def unsubscribe(self, loop, asyncQueue):
+        with self._lock:
+            self._subscribers.remove((loop, asyncQueue))
+
+    def run(self):
+        """Метод для threading. Разбор сырых фронтов в события."""
+        while True:
+            deadlines = [d for d in (self._settleDeadline, self._longPressDeadline) if d is not None]
+            timeout = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+            try:
+                edge = self._edges.get(timeout=timeout)
+            except queue.Empty:
+                self._checkTimers(time.monotonic())
+                continue
+            if edge is None:
+                break
+            timestamp, level = edge
+            self._checkTimers(timestamp)
+            if self._settleDeadline is not None:    # дребезг после недавнего переключения - пропускаем
+                continue
+            self._setState(level == GPIO.LOW, timestamp)    # кнопка замыкает пин на землю
+
+    def _checkTimers(self, now: float):
+        """Обработка истекших таймеров: конец окна дребезга и долгое нажатие"""
+        if self._longPressDeadline is not None and now >= self._longPressDeadline:
+            self._longPressDeadline = None
+            self._emit(ButtonEventType.LONG_PRESS, self._pressTime, now - self._pressTime)
+        if self._settleDeadline is not None and now >= self._settleDeadline:
+            self._settleDeadline = None
+            # за время дребезга могли пропустить последний фронт - сверяемся с реальным уровнем
+            self._setState(GPIO.input(self._channel) == GPIO.LOW, now)
+
+    def _setState(self, pressed: bool, timestamp: float):
+        """Изменение отфильтрованного состояния кнопки и генерация событий"""
+        if pressed == self._pressed:
+            return
+        self._pressed = pressed
+        self._settleDeadline = timestamp + self._debounce
+        if pressed:
+            self._pressTime = timestamp
+            self._longPressDeadline = timestamp + self._longPressTime
+            self._emit(ButtonEventType.PRESS, timestamp, 0)
+            if self._lastRelease is not None and timestamp - self._lastRelease <= self._doubleClickTime:
+                self._secondClick = True
+                self._emit(ButtonEventType.DOUBLE_CLICK, timestamp, 0)
+        else:
+            self._longPressDeadline = None
+            duration = timestamp - self._pressTime
+            # отпускание после обычного (не второго и не долгого) нажатия может начать двойное нажатие
+            if self._secondClick or duration >= self._longPressTime:
+                self._lastRelease = None
+            else:
+                self._lastRelease = timestamp
+            self._secondClick = False
+            self._emit(ButtonEventType.RELEASE, timestamp, duration)
+
+    def _emit(self, eventType: ButtonEventType, timestamp: float, duration: float):
+        """Раздача события: в очередь для опроса, асинхронным потребителям и функциям пользователя"""
+        event = ButtonEvent(eventType, self._channel, timestamp, duration)
+        while True:
+            try:
+                self._events.put_nowait(event)
+                break
+            except queue.Full:  # очередь никто не читает - выкидываем самое старое событие
+                try:
+                    self._events.get_nowait()
+                except queue.Empty:
+                    pass
+        with self._lock:
+            subscribers = list(self._subscribers)
+            callbacks = list(self._callbacks[eventType])
+        for loop, asyncQueue in subscribers:
+            loop.call_soon_threadsafe(asyncQueue.put_nowait, event)
+        for foo in callbacks:
+            if self._pool is not None:
+                self._pool.submit(self._call, foo, event)
+            else:
+                self._call(foo, event)
+
+    @staticmethod
+    def _call(foo, event):
+        """Вызов функции пользователя, ошибка в ней не должна останавливать обработку событий"""
+        try:
+            foo(event)
+        except Exception:
+            import traceback    # нужен только при ошибке, а импортируется долго
+            traceback.print_exc()
+
+
+class LedPattern:
+    """
+    Шаблон мигания светодиода: последовательность шагов (состояние, длительность в секундах).
+    Повторяющийся шаблон идет по кругу, одноразовый - выполняется один раз, после чего светодиод выключается.
+    """
+    def __init__(self, steps: list, repeat=True):
+        """
+        Конструктор класса
+        :param steps: список шагов (True/False, длительность)
+        :param repeat: повторять ли шаблон по кругу
+        """
+        if not steps or any(duration < 0 for _, duration in steps):
+            raise ValueError("Steps must be a non-empty list of (state, duration >= 0).")
+        if repeat and sum(duration for _, duration in steps) <= 0:
+            raise ValueError("Repeating pattern must have positive total duration.")
+        self.steps = [(bool(state), float(duration)) for state, duration in steps]
+        self.repeat = repeat
+
+    @classmethod
+    def blink(cls, rate=1.0):
+        """
+        Равномерное мигание.
+        :param rate: частота мигания, Гц (вспышек в секунду)
+        """
+        half = 0.5 / rate
+        return cls([(True, half), (False, half)])
+
+    @classmethod
+    def heartbeat(cls, period=1.2, flash=0.1):
+        """
+        "Сердцебиение" - две короткие вспышки и пауза.
+        :param period: период шаблона, с
+        :param flash: длительность вспышки, с
+        """
+        return cls([(True, flash), (False, flash), (True, flash), (False, max(period - 3*flash, 0))])
+
+    @classmethod
+    def flashCode(cls, count: int, flash=0.2, pause=1.0):
+        """
+        Код из count вспышек, затем пауза (например, номер ошибки).
+        :param count: количество вспышек
+        :param flash: длительность вспышки и промежутка между вспышками, с
+        :param pause: пауза между повторами кода, с
+        """
+        if count < 1:
+            raise ValueError("Flash count must be positive.")
+        steps = [(True, flash), (False, flash)] * count
+        steps[-1] = (False, pause)
+        return cls(steps)
+
+    @classmethod
+    def pulse(cls, duration=0.1):
+        """
+        Одна вспышка заданной длительности.
+        :param duration: длительность вспышки, с
+        """
+        return cls([(True, duration)], repeat=False)
+
+
+class _LedScheduler(threading.Thread):
+    """
+    Общий для всех светодиодов поток, который выполняет шаблоны мигания.
+    Спит до ближайшего момента переключения, смена шаблона только будит его и не блокирует вызывающего.
+    """
+    def __init__(self):
+        threading.Thread.__init__(self, daemon=True)
+        self._condition = threading.Condition()
+        self._jobs = {}     # пин -> [шаблон, номер шага, момент следующего шага, функция записи состояния]
+
+    def setPattern(self, pin: int, pattern, write):
+        """
+        Запуск шаблона на пине (или остановка, если pattern = None).
+        :param write: функция, которая выставляет состояние светодиода
+        """
+        with self._condition:
+            if pattern is None:
+                self._jobs.pop(pin, None)
+            else:
+                self._jobs[pin] = [pattern, 0, time.monotonic(), write]
+            self._condition.notify()
+
+    def run(self):
+        """Метод для threading. Выполнение шагов шаблонов в нужные моменты времени."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                for pin, job in list(self._jobs.items()):
+                    pattern, step, deadline, write = job
+                    while deadline <= now:  # выполняем все наступившие шаги (нулевые шаги - сразу)
+                        if step >= len(pattern.steps):
+                            if not pattern.repeat:  # одноразовый шаблон закончился - гасим светодиод
+                                write(False)
+                                del self._jobs[pin]
+                                break
+                            step = 0
+                        state, duration = pattern.steps[step]
+                        write(state)
+                        step += 1
+                        deadline += duration
+                    else:
+                        job[1], job[2] = step, deadline
+                deadlines = [job[2] for job in self._jobs.values()]
+                self._condition.wait(max(0, min(deadlines) - time.monotonic()) if deadlines else None)
+
+
+_ledScheduler = None    # общий поток шаблонов, запускается при первом шаблоне
+_ledSchedulerLock = threading.Lock()
+
+
+def _getLedScheduler():
+    """Возвращает (и при необходимости запускает) общий поток шаблонов мигания"""
+    global _ledScheduler
+    with _ledSchedulerLock:
+        if _ledScheduler is None:
+            _ledScheduler = _LedScheduler()
+            _ledScheduler.start()
+    return _ledScheduler
+
+
+class Gpio:
+    """Класс для работы с кнопкой и светодиодом"""
+    def __init__(self):   # флаг, по которому будем очищать (или нет) GPIO
+        _loadGpio()
+        GPIO.setwarnings(False)  # очищаем, если кто-то еще использовал GPIO воизбежание ошибок
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(_chanButton, GPIO.IN, pull_up_down = GPIO.PUD_OFF)
+        GPIO.setup(_chanLed, GPIO.OUT, initial=GPIO.LOW)
+        self._buttonParams = dict(debounce=0.05, longPressTime=1.0, doubleClickTime=0.4, workers=1, queueSize=64)
+        self._button = None     # поток обработки событий кнопки, запускается при первой необходимости
+        self._ledState = False  # состояние светодиода хранится программно, чтобы не читать пин
+        self._ledPatternOn = False  # выполняется ли сейчас шаблон мигания
+
+    def buttonSetup(self, debounce=0.05, longPressTime=1.0, doubleClickTime=0.4, workers=1, queueSize=64):
+        """
+        Настройка обработки событий кнопки. Вызывать до первого buttonAddEvent/buttonGetEvent/buttonEvents.
+        :param debounce: время подавления дребезга, с
+        :param longPressTime: через сколько секунд удержания срабатывает LONG_PRESS
+        :param doubleClickTime: максимальная пауза между отпусканием и следующим нажатием для DOUBLE_CLICK, с
+        :param workers: сколько потоков вызывает функции пользователя (0 - вызывать в потоке обработки событий)
+        :param queueSize: длина очереди для buttonGetEvent (при переполнении теряются самые старые события)
+        """
+        if self._button is not None:
+            raise RuntimeError("Button events are already started!")
+        self._buttonParams = dict(debounce=debounce, longPressTime=longPressTime, doubleClickTime=doubleClickTime,
+                                  workers=workers, queueSize=queueSize)
+
+    def _startButton(self):
+        """Запуск обработки событий кнопки (один раз)"""
+        if self._button is None:
+            self._button = _ButtonDispatcher(_chanButton, **self._buttonParams)
+            self._button.start()
+            GPIO.add_event_detect(_chanButton, GPIO.BOTH, callback=self._button.onEdge)
+        return self._button
+
+    def buttonAddEvent(self, foo, event=ButtonEventType.PRESS):
+        """
+        Добавление функции, которая срабатывает при событии кнопки (по умолчанию - при нажатии).
+        Функция вызывается не в потоке RPi.GPIO, а в отдельном пуле потоков, поэтому может работать долго.
+        :param foo: Передаваемая функция, обязательно должна иметь один аргумент - событие ButtonEvent (см. пример)
+        :param event: тип события из ButtonEventType
+        """
+        if foo is not None and callable(foo):
+            self._startButton().addCallback(ButtonEventType(event), foo)
+        else:
+            raise TypeError("Parameter must be callable function!")
+
+    def buttonGetEvent(self, timeout=None):
+        """
+        Получение следующего события кнопки из очереди.
+        :param timeout: сколько ждать события, с (None - ждать бесконечно, 0 - не ждать)
+        :return: ButtonEvent или None, если событий не было
+        """
+        return self._startButton().getEvent(timeout=timeout)
+
+    async def buttonEvents(self):
+        """
+        Асинхронный перебор событий кнопки:
+        async for event in gpio.buttonEvents(): ...
+        """
+        import asyncio
+        button = self._startButton()
+        loop = asyncio.get_running_loop()
+        asyncQueue = asyncio.Queue()
+        button.subscribe(loop, asyncQueue)
+        try:
+            while True:
+                yield await asyncQueue.get()
+        finally:
+            button.unsubscribe(loop, asyncQueue)
+
+    def ledSet(self, value: bool):
+        """
+        Включение/выключение светодиода.
+        :param value: True или False - соответственно вкл и выкл.
+        :return:
+        """
+        self._ledStopPattern()
+        self._ledWrite(value)
+
+    def ledToggle(self):
+        """Переключение состояния светодиода"""
+        self._ledStopPattern()
+        self._ledWrite(not self._ledState)
+
+    def ledPattern(self, pattern):
+        """
+        Запуск шаблона мигания в общем фоновом потоке. Не блокирует, новый шаблон сразу заменяет предыдущий.
+        :param pattern: LedPattern (например LedPattern.blink(2)) или None - остановить шаблон и выключить светодиод
+        """
+        if pattern is not None and not isinstance(pattern, LedPattern):
+            raise TypeError("Pattern must be LedPattern or None!")
+        if pattern is None:
+            self._ledStopPattern()
+            self._ledWrite(False)
+        else:
+            self._ledPatternOn = True
+            _getLedScheduler().setPattern(_chanLed, pattern, self._ledWrite)
+
+    def _ledStopPattern(self):
+        """Остановка шаблона мигания, если он выполняется"""
+        if self._ledPatternOn:
+            self._ledPatternOn = False
+            _getLedScheduler().setPattern(_chanLed, None, None)
+
+    def _ledWrite(self, value: bool):
+        """Запись состояния на пин светодиода с запоминанием"""
+        self._ledState = bool(value)
+        GPIO.output(_chanLed, self._ledState)
+
+    def cleanUp(self):
+        """Очистка GPIO при закрытии программы"""
+        self._ledStopPattern()
+        if self._button is not None:
+            GPIO.remove_event_detect(_chanButton)
+            self._button.stop()     # ждет завершения потока, который еще может читать пин
+            self._button = None
+        GPIO.cleanup()
@@ -0,0 +1,139 @@
+"""
+Цикл управления с постоянной частотой.
+
+Вместо `while True: ... time.sleep(x)`, у которого период плывет на время выполнения тела цикла,
+моменты запуска шагов отсчитываются от начала работы по монотонным часам: k-й шаг должен начаться
+в момент start + k * period. По ходу работы собирается статистика: отклонение периода, опоздания,
+превышения периода и время выполнения шага.
+"""
+import math
+import threading
+import time
+from collections import deque
+from enum import IntEnum
+
+from . import pwm
+
+
+class Overrun(IntEnum):     # что делать, если шаг не уложился в период
+    SKIP = 0                # пропущенные моменты запуска не выполняются, следующий шаг - в ближайший момент по сетке
+    CATCH_UP = 1            # пропущенные шаги выполняются подряд без ожидания, пока цикл не догонит сетку
+
+
+def _percentile(values: list, q: float):
+    """Перцентиль q (0 - 1) по отсортированному списку"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class ControlLoop(threading.Thread):
+    """Вызов функции с постоянной частотой (в текущем потоке через run или в отдельном через start)"""
+    def __init__(self, step, rate: float, overrun=Overrun.SKIP, stagePwm=True, ticks=None, historySize=1000):
+        """
+        Конструктор класса
+        :param step: функция шага, принимает номер шага; если вернет False - цикл завершится
+        :param rate: частота вызова, Гц
+        :param overrun: поведение при превышении периода (Overrun.*)
+        :param stagePwm: откладывать запись каналов ШИМ, заданных в шаге, и отправлять их в конце шага
+        (см. pwm.stagePwm). Действует только на поток цикла, setValue из других потоков пишется сразу
+        :param ticks: сколько шагов выполнить (None - пока не вызван stop)
+        :param historySize: по скольким последним шагам считаются перцентили
+        """
+        threading.Thread.__init__(self, daemon=True)
+        if rate <= 0:
+            raise ValueError("rate must be positive!")
+        if not isinstance(overrun, Overrun):
+            raise ValueError("overrun must be set as Overrun.* !!")
+        self._step = step
+        self._period = 1.0 / rate
+        self._overrun = overrun
+        self._stagePwm = stagePwm
+        self._ticks = ticks
+        self._stopEvent = threading.Event()
+        self._stepTimes = deque(maxlen=historySize)     # время выполнения шага, с
+        self._jitters = deque(maxlen=historySize)       # отклонение интервала между запусками от периода, с
+        self.resetStats()
+
+    def resetStats(self):
+        """Сброс статистики"""
+        self._tickCount = 0
+        self._overrunCount = 0
+        self._skippedCount = 0
+        self._maxStepTime = 0.0
+        self._maxJitter = 0.0
+        self._maxLateness = 0.0
+        self._stepTimes.clear()
+        self._jitters.clear()
+
+    def stop(self):
+        """Остановка цикла (текущий шаг доработает до конца)"""
+        self._stopEvent.set()
+
+    def run(self):
+        """Метод для threading. Можно вызвать и напрямую - тогда цикл работает в текущем потоке."""
+        period = self._period
+        tick = 0
+        deadline = time.monotonic()
+        lastStart = None
+        if self._stagePwm:
+            pwm.stagePwm()
+        try:
+            while not self._stopEvent.is_set() and (self._ticks is None or tick < self._ticks):
+                delay = deadline - time.monotonic()
+                if delay > 0 and self._stopEvent.wait(delay):
+                    break
+                start = time.monotonic()
+                self._maxLateness = max(self._maxLateness, start - deadline)
+                if lastStart is not None:
+                    jitter = start - lastStart - period
+                    self._jitters.append(jitter)
+                    self._maxJitter = max(self._maxJitter, abs(jitter))
+                lastStart = start
+
+                result = self._step(tick)
+                if self._stagePwm:
+                    pwm.flushPwm()  # все значения, заданные за шаг, уходят на шину вместе
+
+                end = time.monotonic()
+                self._stepTimes.append(end - start)
+                self._maxStepTime = max(self._maxStepTime, end - start)
+                self._tickCount += 1
+                tick += 1
+                deadline += period
+                if end > deadline:  # шаг не уложился в период
+                    self._overrunCount += 1
+                    if self._overrun == Overrun.SKIP:
+                        missed = int((end - deadline) // period) + 1
+                        self._skippedCount += missed
+                        deadline += missed * period
+                if result is False:
+                    break
+        finally:
+            if self._stagePwm:
+                pwm.stagePwm(False)
+
+    def getPeriod(self):
+        """Возвращает период цикла, с"""
+        return self._period
+
+    def getStats(self):
+        """
+        Статистика работы цикла (времена в секундах).
+        :return: словарь: количество шагов, превышений периода и пропущенных шагов, среднее и максимальное
+        отклонение периода, максимальное опоздание запуска, перцентили времени шага (p50, p90, p99) и максимум
+        """
+        # копии одним вызовом: цикл в другом потоке может дописывать в deque во время перебора
+        stepTimes = sorted(tuple(self._stepTimes))
+        jitters = [abs(j) for j in tuple(self._jitters)]
+        meanJitter = math.fsum(jitters) / len(jitters) if jitters else 0.0
+        return {"ticks": self._tickCount,
+                "overruns": self._overrunCount,
+                "skipped": self._skippedCount,
+                "jitterMean": meanJitter,
+                "jitterMax": self._maxJitter,
+                "latenessMax": self._maxLateness,
+                "stepP50": _percentile(stepTimes, 0.5),
+                "stepP90": _percentile(stepTimes, 0.9),
+                "stepP99": _percentile(stepTimes, 0.99),
+                "stepMax": self._maxStepTime}
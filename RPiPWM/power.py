@@ -0,0 +1,157 @@
+"""
+Управление энергопотреблением при простое.
+
+Если заданное время не было ни одной команды для PCA9685 или дисплея, микросхема ШИМ усыпляется
+(бит SLEEP - осциллятор выключается, импульсов на каналах нет), дисплей выключается, а АЦП опрашивается реже.
+Следующая команда устройству сама его будит: перед транзакцией шина сообщает менеджеру адрес устройства,
+и менеджер успевает восстановить работу до того, как команда уйдет на шину.
+"""
+import threading
+import time
+import warnings
+
+from . import bus
+from .bus import _I2c
+from .pwm import _PCA9685_ADDRESS, _MODE1, _RESTART, _SLEEP
+from .display import _SSD1306_I2C_ADDRESS, _SSD1306_DISPLAYOFF, _SSD1306_DISPLAYON
+
+
+class IdleManager(threading.Thread):
+    """Менеджер простоя: усыпляет устройства после периода бездействия и будит при следующей команде"""
+    def __init__(self, timeout=60.0, pwm=True, display=True, battery=None, idlePeriod=1.0):
+        """
+        Конструктор класса
+        :param timeout: через сколько секунд без команд переходить в режим простоя
+        :param pwm: усыплять ли PCA9685
+        :param display: выключать ли дисплей
+        :param battery: объект Battery, который при простое опрашивается реже (None - не трогать)
+        :param idlePeriod: период опроса АЦП при простое, с
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self._timeout = timeout
+        self._battery = battery
+        self._idlePeriod = idlePeriod
+        self._activePeriod = None   # период опроса АЦП до перехода в простой
+        self._i2c = _I2c()
+        self._condition = threading.Condition()
+        self._local = threading.local()     # флаг "транзакция самого менеджера", чтобы не будить себя
+        self._devices = set()   # адреса устройств, за которыми следим
+        if pwm:
+            self._devices.add(_PCA9685_ADDRESS)
+        if display:
+            self._devices.add(_SSD1306_I2C_ADDRESS)
+        self._asleep = set()    # адреса устройств, которые сейчас спят
+        self._lastActivity = time.monotonic()
+        self.__exit = False
+        self._wakeCount = 0
+        self._lastWakeLatency = 0.0
+        self._maxWakeLatency = 0.0
+
+    def start(self):
+        """Запуск отслеживания простоя (может быть только один менеджер)"""
+        if bus._activityHook is not None:
+            raise RuntimeError("Another idle manager is already running!")
+        bus._activityHook = self._onActivity
+        threading.Thread.start(self)
+
+    def stop(self):
+        """Остановка: все устройства будятся, отслеживание прекращается"""
+        with self._condition:
+            self.__exit = True
+            self._wake(set(self._asleep))
+            self._condition.notify()
+        if bus._activityHook == self._onActivity:
+            bus._activityHook = None
+
+    def run(self):
+        """Метод для threading. Ожидание периода бездействия."""
+        with self._condition:
+            while not self.__exit:
+                if self._asleep == self._devices:   # все уже спят - ждем, пока кого-нибудь разбудят
+                    self._condition.wait()
+                    continue
+                remaining = self._lastActivity + self._timeout - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                else:
+                    self._sleep(self._devices - self._asleep)
+
+    def _onActivity(self, addr: int):
+        """Вызывается шиной перед каждой транзакцией"""
+        if addr not in self._devices or getattr(self._local, "internal", False):
+            return
+        # под блокировкой: иначе команда может проскочить между записью SLEEP и отметкой "спит" в _sleep
+        with self._condition:
+            self._lastActivity = time.monotonic()
+            if addr in self._asleep:
+                self._wake({addr})
+                self._condition.notify()
+
+    def _sleep(self, devices: set):
+        """Перевод устройств в режим простоя (под блокировкой)"""
+        if time.monotonic() - self._lastActivity < self._timeout:   # пока ждали блокировку, пришла команда
+            return
+        self._local.internal = True
+        try:
+            for addr in devices:
+                try:
+                    if addr == _PCA9685_ADDRESS:
+                        mode1 = self._i2c.readU8(_PCA9685_ADDRESS, _MODE1)
+                        # запись 0 в бит RESTART ничего не меняет, записываем только SLEEP
+                        self._i2c.writeByteData(_PCA9685_ADDRESS, _MODE1, (mode1 & ~_RESTART) | _SLEEP)
+                    elif addr == _SSD1306_I2C_ADDRESS:
+                        self._i2c.writeByteData(_SSD1306_I2C_ADDRESS, 0x00, _SSD1306_DISPLAYOFF)
+                except OSError:     # устройство не отвечает (например, дисплей не подключен) - больше не следим
+                    warnings.warn("Device 0x{:02X} does not respond, idle manager stops tracking it.".format(addr))
+                    self._devices.discard(addr)
+                    continue
+                self._asleep.add(addr)  # спящим считаем только после успешной записи
+        finally:
+            self._local.internal = False
+        if self._asleep and self._battery is not None and self._activePeriod is None:
+            self._activePeriod = self._battery.getPeriod()
+            self._battery.setPeriod(self._idlePeriod)
+
+    def _wake(self, devices: set):
+        """Пробуждение устройств (под блокировкой) с замером задержки"""
+        devices = devices & self._asleep
+        if not devices:
+            return
+        start = time.monotonic()
+        self._local.internal = True
+        try:
+            if _PCA9685_ADDRESS in devices:
+                mode1 = self._i2c.readU8(_PCA9685_ADDRESS, _MODE1)
+                self._i2c.writeByteData(_PCA9685_ADDRESS, _MODE1, mode1 & ~(_SLEEP | _RESTART))
+                time.sleep(0.0005)  # осциллятору нужно до 500 мкс, чтобы запуститься
+                if mode1 & _RESTART:    # каналы были активны до сна - перезапускаем их с прежними значениями
+                    self._i2c.writeByteData(_PCA9685_ADDRESS, _MODE1, (mode1 & ~_SLEEP) | _RESTART)
+            if _SSD1306_I2C_ADDRESS in devices:    # содержимое памяти дисплея сохраняется, достаточно включить
+                self._i2c.writeByteData(_SSD1306_I2C_ADDRESS, 0x00, _SSD1306_DISPLAYON)
+        finally:
+            self._local.internal = False
+        self._asleep -= devices
+        if self._battery is not None and self._activePeriod is not None:
+            self._battery.setPeriod(self._activePeriod)
+            self._activePeriod = None
+        latency = time.monotonic() - start
+        self._wakeCount += 1
+        self._lastWakeLatency = latency
+        self._maxWakeLatency = max(self._maxWakeLatency, latency)
+
+    def isIdle(self):
+        """Возвращает True, если устройства сейчас спят"""
+        return bool(self._asleep)
+
+    def getWakeLatency(self):
+        """Возвращает задержку последнего пробуждения, с (на столько была задержана команда, которая разбудила)"""
+        return self._lastWakeLatency
+
+    def getStats(self):
+        """
+        Статистика пробуждений.
+        :return: словарь: количество пробуждений, последняя и максимальная задержка (с)
+        """
+        return {"wakeCount": self._wakeCount,
+                "lastWakeLatency": self._lastWakeLatency,
+                "maxWakeLatency": self._maxWakeLatency}
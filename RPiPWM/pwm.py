@@ -0,0 +1,509 @@
+import time
+from enum import IntEnum   # для создания нумерованных списков
+import math
+import threading
+import warnings
+
+from .bus import _I2c
+
+
+_PCA9685_ADDRESS = 0x40
+_MODE1 = 0x00
+_MODE2 = 0x01
+_SUBADR1 = 0x02
+_SUBADR2 = 0x03
+_SUBADR3 = 0x04
+_PRESCALE = 0xFE
+_LED0_ON_L = 0x06
+_LED0_ON_H = 0x07
+_LED0_OFF_L = 0x08
+_LED0_OFF_H = 0x09
+_ALL_LED_ON_L = 0xFA
+_ALL_LED_ON_H = 0xFB
+_ALL_LED_OFF_L = 0xFC
+_ALL_LED_OFF_H = 0xFD
+
+# Биты для работы с PCA9685:
+_RESTART = 0x80     # при чтении возвращает свое состояние, при записи - разрешает или запрещает перезагрузку
+_AI = 0x20          # автоинкремент номера регистра (для блочного чтения и записи)
+_SLEEP = 0x10       # режим энергосбережения (выключен внутренний осциллятор)
+_ALLCALL = 0x01     # PCA9685 будет отвечать на запрос всех устройств на шине
+_INVRT = 0x10       # инверсный или неинверсный выход сигнала на микросхеме
+_OUTDRV = 0x04      # способ подключения светодиодов (см. даташит, нам это вроде не надо)
+
+'''
+################################  ВНИМАНИЕ  ########################################
+#############  Я ПОКА НЕ ЗНАЮ КАК СДЕЛАТЬ БЕЗ ГЛОБАЛЬНЫХ ПЕРЕМЕННЫХ  ###############
+################################  МНЕ ЖАЛЬ  ########################################
+'''
+_pwmIsInited = False    # глобальный флаг, по которому будем отслеживать, нужна ли микросхеме новая инициализация
+_pwmList = {}    # глобальный словарь, который содержит номер канала и выставленный режим
+
+
+class _PwmMode(IntEnum):    # список режимов работы
+    servo90 = 90            # серва 90 градусов
+    servo120 = 120          # серва 120 градусов
+    servo180 = 180          # серва 180 градусов
+    servo270 = 270          # серва 270 градусов
+    forwardMotor = 100      # мотор без реверса
+    reverseMotor = 4        # мотор с реверсом
+    onOff = 5               # вкл/выкл пина
+
+
+class PwmFreq(IntEnum):     # список возможных частот работы
+    H50 = 50                # 50 Гц
+    H125 = 125              # 125 Гц
+    H250 = 250              # 250 Гц
+
+
+_global_freq = None  # глобальная переменная, содержащая информацию о текущей частоте работы микросхемы
+_pwmAdopted = {}    # номер канала -> значение в "попугаях", прочитанное с уже работающей микросхемы (см. _pwmAttach)
+# отложенная запись (см. stagePwm) у каждого потока своя: staged - номер канала -> значение в "попугаях"
+# (None - отложенная запись выключена), depth - сколько раз она включена и еще не выключена
+_pwmStage = threading.local()
+_pwmStageLock = threading.Lock()    # запись блоков отложенных значений из разных потоков
+_pwmAutoIncrement = False   # выставлен ли бит AI для блочной записи отложенных значений
+_pwmBus = None      # шина для записи отложенных значений
+_STAGE_BLOCK = 8    # каналов в одном блоке: 8*4 = 32 байта - предел блочной записи smbus
+
+
+def _prescaleToFreq(prescale: int):
+    """
+    Подбор частоты из PwmFreq по значению регистра PRESCALE.
+    :return: PwmFreq или None, если значение не соответствует ни одной из частот
+    """
+    freqHz = 25000000.0 / (4096.0 * (prescale + 1))
+    freq = min(PwmFreq, key=lambda f: abs(f - freqHz))
+    if abs(freq - freqHz) > freq * 0.05:
+        return None
+    return freq
+
+
+def _pwmAttach(i2c: _I2c):
+    """
+    Подключение к уже работающей микросхеме без переинициализации.
+    Читает MODE1, PRESCALE и регистры всех каналов и запоминает частоту и значения каналов.
+    :return: True, если микросхема уже была инициализирована и ее состояние принято
+    """
+    global _global_freq
+    mode1 = i2c.readU8(_PCA9685_ADDRESS, _MODE1)
+    if mode1 & _SLEEP:      # осциллятор спит (так после включения питания) - нужна обычная инициализация
+        return False
+    freq = _prescaleToFreq(i2c.readU8(_PCA9685_ADDRESS, _PRESCALE))
+    if freq is None:
+        warnings.warn("Unsupported PWM frequency on the chip, it will be reinitialized.")
+        return False
+    if not mode1 & _AI:     # для чтения всех каналов одним блоком нужен автоинкремент, на выходы он не влияет
+        i2c.writeByteData(_PCA9685_ADDRESS, _MODE1, (mode1 & ~_RESTART) | _AI)
+    regs = i2c.readRaw(_PCA9685_ADDRESS, _LED0_ON_L, 16*4)
+    for channel in range(16):
+        onL, onH, offL, offH = regs[4*channel:4*channel + 4]
+        if offH & 0x10:     # бит "всегда выключен"
+            count = 0
+        elif onH & 0x10:    # бит "всегда включен"
+            count = 4095
+        else:
+            count = ((((offH & 0x0F) << 8) | offL) - (((onH & 0x0F) << 8) | onL)) % 4096
+        _pwmAdopted[channel] = count
+    _global_freq = freq
+    return True
+
+
+def stagePwm(enable=True):
+    """
+    Включение отложенной записи для текущего потока: setValue у всех каналов только запоминает значение,
+    а на шину все значения уходят при вызове flushPwm (соседние каналы - одной транзакцией).
+    На setValue из других потоков не влияет. Включения можно вкладывать (например, цикл управления
+    внутри кода, который сам включил отложенную запись): обычная запись возвращается, когда каждому
+    stagePwm() соответствует свой stagePwm(False).
+    :param enable: False - записать накопленные значения и выключить отложенную запись
+    """
+    depth = getattr(_pwmStage, "depth", 0)
+    if enable:
+        if depth == 0:
+            _pwmStage.staged = {}
+        _pwmStage.depth = depth + 1
+    elif depth > 0:
+        if depth == 1:
+            flushPwm()
+            _pwmStage.staged = None
+        _pwmStage.depth = depth - 1
+
+
+def _pwmStagedValue(channel: int):
+    """Отложенное значение канала в текущем потоке (None - его нет)"""
+    staged = getattr(_pwmStage, "staged", None)
+    if staged is None:
+        return None
+    return staged.get(channel)
+
+
+def flushPwm():
+    """
+    Запись отложенных значений каналов текущего потока (если отложенная запись не включена - ничего не делает).
+    :return: количество записанных каналов
+    """
+    global _pwmAutoIncrement, _pwmBus
+    staged = getattr(_pwmStage, "staged", None)
+    if not staged:
+        return 0
+    values = sorted(staged.items())
+    staged.clear()
+    with _pwmStageLock:
+        if _pwmBus is None:
+            _pwmBus = _I2c()
+        if not _pwmAutoIncrement:   # без автоинкремента блок запишется в один регистр
+            mode1 = _pwmBus.readU8(_PCA9685_ADDRESS, _MODE1)
+            if not mode1 & _AI:
+                _pwmBus.writeByteData(_PCA9685_ADDRESS, _MODE1, (mode1 & ~_RESTART) | _AI)
+            _pwmAutoIncrement = True
+        start = 0
+        while start < len(values):  # делим на блоки из подряд идущих каналов
+            end = start + 1
+            while (end < len(values) and end - start < _STAGE_BLOCK
+                   and values[end][0] == values[end - 1][0] + 1):
+                end += 1
+            block = bytearray()
+            for channel, value in values[start:end]:
+                block += bytes((0, 0, value & 0xFF, value >> 8))   # момент включения, момент выключения
+            _pwmBus.writeList(_PCA9685_ADDRESS, _LED0_ON_L + 4 * values[start][0], block)
+            start = end
+    return len(values)
+
+
+class PwmBase:
+    """Базовый класс для управления драйвером ШИМ (PCA9685)"""
+    def __init__(self, channel: int, mode, freq=PwmFreq.H50, extended=False, attach=False):
+        """
+        Конструктор класса
+        :param channel: номер канала устройства
+        :param mode: режим работы (какое устройство подключается)
+        :param extended: флаг расширенного режима работы (0.5 - 2.5 мс, вместо 1 - 2 мс)
+        :param attach: подключиться к уже работающей микросхеме, не переинициализируя ее
+        """
+        global _pwmIsInited, _global_freq
+        self._i2c = _I2c()  # объект для общения с i2c шиной
+        if (channel > 15) or (channel < 0):
+            raise ValueError("Channel number must be from 0 to 15 (inclusive).")
+        if attach and not _pwmIsInited:
+            # если микросхема уже работает - принимаем ее частоту и значения каналов, иначе обычная инициализация
+            _pwmIsInited = _pwmAttach(self._i2c)
+        self._channel = channel
+        self._mode = mode
+        self._extended = extended
+        self._value = 0     # значение, которе установлено на канале
+
+        if not isinstance(freq, PwmFreq):
+            raise ValueError("freq must be set as PwmFreq.H* !!")
+        else:
+            if _global_freq is None:    # если частота еще не была задана - задаем
+                self._freq = freq
+                _global_freq = freq
+            elif _global_freq == freq:  # если была задана такой же - задаем
+                self._freq = freq
+            else:                       # если была задана другой - ругаемся
+                warnings.warn("Frequency was already set! Current frequency is: {} Hz".format(int(_global_freq)))
+                self._freq = _global_freq
+
+        # при соответствующей частоте получаем:
+        # 4096 - весь период, в зависимости от частоты это может быть 20, 8, 4 мс при 50, 125, 250 Гц соответственно
+        self._parrot_ms = int(4096*self._freq/1000)
+        self._min = self._parrot_ms     # минимальное значение = 1 мс
+        self._max = self._parrot_ms*2   # максимальное значение = 2 мс
+        self._range = self._max - self._min     # диапазон от min до max, нужен для вычислений
+        self._wideMin = int(self._min/2)        # при расширенном диапазоне минимум = 0.5 мс
+        self._wideMax = self._wideMin*5         # при расширенном диапазоне максимум = 2.5 мс
+        self._wideRange = self._wideMax - self._wideMin     # аналогично, но тут расширенный диапазон
+        if not _pwmIsInited:    # если микросхема еще не была инициализирована
+            self._i2c.writeByteData(_PCA9685_ADDRESS, _MODE2, _OUTDRV)
+            self._i2c.writeByteData(_PCA9685_ADDRESS, _MODE1, _ALLCALL)
+            time.sleep(0.005)
+            mode1 = self._i2c.readU8(_PCA9685_ADDRESS, _MODE1)  # читаем установленный режим
+            mode1 = mode1 & ~_SLEEP  # будим
+            self._i2c.writeByteData(_PCA9685_ADDRESS, _MODE1, mode1)
+            time.sleep(0.005)
+            self._setPwmFreq(self._freq)    # устанавливаем частоту сигнала
+            _pwmIsInited = True     # поднимаем флаг, что микросхема инициализирована
+        if channel in _pwmAdopted:  # канал уже работал до запуска программы - продолжаем с его значения
+            self._value = self._countToValue(_pwmAdopted.pop(channel))
+
+    def _countToValue(self, count: int):
+        """
+        Преобразование длительности импульса в "попугаях" обратно в значение для setValue.
+        :param count: длительность импульса (0 - 4095)
+        """
+        if self._mode == _PwmMode.onOff:
+            return count > 0
+        if count == 0:      # импульсов нет - значение по умолчанию
+            return 0
+        if self._extended is False:
+            minimum, span = self._min, self._range
+        else:
+            minimum, span = self._wideMin, self._wideRange
+        if self._mode == _PwmMode.reverseMotor:
+            value = (count - minimum) * 200 / span - 100
+            return int(round(max(-100, min(100, value))))
+        value = (count - minimum) * self._mode.value / span
+        return int(round(max(0, min(self._mode.value, value))))
+
+    def _setPwmFreq(self, freqHz: PwmFreq):
+        """
+        Установка частоты ШИМ сигнала.
+        :param freqHz: Частота ШИМ сигнала (Гц)
+        """
+        prescaleval = 25000000.0    # 25MHz
+        prescaleval /= 4096.0       # 12-bit
+        prescaleval /= freqHz
+        prescaleval -= 1
+        prescale = int(math.floor(prescaleval + 0.5))
+        oldmode = self._i2c.readU8(_PCA9685_ADDRESS, _MODE1)    # смотрим какой режим был у микросхемы
+        newmode = (oldmode & 0x7F) | 0x10   # отключаем внутреннее тактирование, чтобы внести изменения
+        self._i2c.writeByteData(_PCA9685_ADDRESS, _MODE1, newmode)
+        self._i2c.writeByteData(_PCA9685_ADDRESS, _PRESCALE, prescale)  # изменяем частоту
+        self._i2c.writeByteData(_PCA9685_ADDRESS, _MODE1, oldmode)  # включаем тактирование обратно
+        time.sleep(0.005)   # ждем пока оно включится
+        # разрешаем микросхеме отвечать на subaddress 1
+        self._i2c.writeByteData(_PCA9685_ADDRESS, _MODE1, oldmode | 0x08)
+
+    def _setPwm(self, value: int):
+        """
+        Установка длительности импульса ШИМ для канала.
+        :param value: Длительность (в попугаях микросхемы. 205 "попугаев" ~ 1000 мкс)
+        """
+        staged = getattr(_pwmStage, "staged", None)
+        if staged is not None:  # отложенная запись - значение уйдет на шину при flushPwm
+            staged[self._channel] = value
+            return
+        self._i2c.writeByteData(_PCA9685_ADDRESS, _LED0_ON_L + 4 * self._channel, 0 & 0xFF)   # момент включения в цикле
+        self._i2c.writeByteData(_PCA9685_ADDRESS, _LED0_ON_H + 4 * self._channel, 0 >> 8)
+        self._i2c.writeByteData(_PCA9685_ADDRESS, _LED0_OFF_L + 4 * self._channel, value & 0xFF)  # момент выключения в цикле
+        self._i2c.writeByteData(_PCA9685_ADDRESS, _LED0_OFF_H + 4 * self._channel, value >> 8)
+
+    def setMcs(self, value: int):
+        """
+        Установка длительности импульса ШИМ в мкс
+        :param value: Длительность импульса в мкс
+        """
+        max_mcs = 1/self._freq  # максимальая длительность импульса в зависимости от частоты (в секундах)
+        max_mcs *= 1000000      # максимальная длительность импульса в микросекунднах
+
+        if value > max_mcs:     # обрезаем диапазон - от 0 до максимального
+            value = max_mcs
+        if value < 0:
+            value = 0
+        self._value = value     # запоминаем значение до преобразований
+        value /= 1000           # приводим мкс к мс
+        value *= self._parrot_ms    # приводим мс к попугаям которые затем задаются на ШИМ
+        if value > 4095:            # обрезаем максимальное значение, чтобы микросхема не сходила с ума
+            value = 4095
+        self._setPwm(int(value))
+
+    def getMcs(self):
+        """
+        Возвращает текущее значение длительности импульса ШИМ, выставленное на канале (в мкс).
+        Если в этом потоке для канала есть отложенное значение (см. stagePwm) - возвращает его,
+        так как на микросхеме пока старое.
+        """
+        result = _pwmStagedValue(self._channel)
+        if result is None:
+            reading_H = self._i2c.readU8(_PCA9685_ADDRESS, _LED0_OFF_H + 4 * self._channel)
+            reading_L = self._i2c.readU8(_PCA9685_ADDRESS, _LED0_OFF_L + 4 * self._channel)
+            result = (reading_H << 8) + reading_L
+        return int((result / self._parrot_ms) * 1000)
+
+    def getValue(self):
+        """Возвращает последнее значение, установленное на канале."""
+        return self._value
+
+    def setValue(self, value: int):  # устанавливаем значение
+        """
+        Установка значения для канала
+        :param value: значение зависит от режима работы канала (угол, скорость и т.п.)
+        """
+        if self._mode == _PwmMode.onOff:   # если режим вкл/выкл (ему неважен расширенный диапазон)
+            if value < 0:
+                raise ValueError("Value must be True or False for On/Off mode")
+            self._value = value     # запоминаем какое значение мы задаем (до всех преобразований)
+            if value is True:   # если надо включить (True) - зажигаем полностью
+                value = 4095
+            else:               # иначе выключаем
+                value = 0
+        else:
+            if self._extended is False:     # если диапазон не расширенный
+                if self._mode == _PwmMode.reverseMotor:  # если говорим о моторе с реверсом
+                    if value < -100:    # обрезаем диапазон
+                        value = -100
+                    if value > 100:
+                        value = 100
+                    self._value = value     # запоминаем какое значение мы задаем (до всех преобразований)
+                    value += 100    # сдвигаем диапазон -100-100 -> 0-200
+                    value *= self._range/200    # чуть изменяем 0-200 -> 0-range
+                    value += self._min          # сдвигаем 0-range -> min-max
+                else:
+                    if value < 0:   # обрезаем крайние значения
+                        value = 0
+                    if value > self._mode.value:
+                        value = self._mode.value
+                    self._value = value     # запоминаем какое значение мы задаем (до всех преобразований)
+                    value *= self._range/self._mode.value   # изменяем диапазон 0-mode -> 0-range
+                    value += self._min      # сдвигаем диапазон 0-range -> min-max
+            else:   # если диапазон расширенный
+                if self._mode == _PwmMode.reverseMotor:  # если говорим о моторе с реверсом
+                    if value < -100:    # обрезаем диапазон
+                        value = -100
+                    if value > 100:
+                        value = 100
+                    self._value = value  # запоминаем какое значение мы задаем (до всех преобразований)
+                    value += 100    # сдвигаем диапазон -100-100 -> 0-200
+                    value *= self._wideRange/200    # чуть изменяем 0-200 -> 0-range
+                    value += self._wideMin      # сдвигаем 0-range -> min-max
+                else:
+                    if value < 0:   # обрезаем крайние значения
+                        value = 0
+                    if value > self._mode.value:
+                        value = self._mode.value
+                    self._value = value  # запоминаем какое значение мы задаем (до всех преобразований)
+                    value *= self._wideRange/self._mode.value   # изменяем диапазон 0-mode -> 0-range
+                    value += self._wideMin      # сдвигаем диапазон 0-range -> min-max
+        self._setPwm(int(value))  # устанавливаем значение
+
+
+'''
+Классы для управления переферией. Параметры - номер канала, частота и является ли диапазон расширенным
+'''
+
+
+class Servo90(PwmBase):
+    """Класс для управления сервой 90 град"""
+    def __init__(self, channel, freq=PwmFreq.H50, extended=False, attach=False):
+        """
+        Конструктор класса
+        :param channel: номер канала
+        :param freq: частота работы
+        :param extended: флаг расширенного режима работы (0.5 - 2.5 мс, вместо 1 - 2 мс)
+        :param attach: подключиться к уже работающей микросхеме, не переинициализируя ее
+        """
+        global _pwmList
+        mode = _PwmMode.servo90
+        if _pwmList.get(channel) is None:
+            _pwmList[channel] = mode    # отмечаем, что канал занят
+            super(Servo90, self).__init__(channel, mode, freq, extended, attach)
+        else:
+            raise ValueError("This channel is already used!")
+
+
+class Servo120(PwmBase):
+    """Класс для управления сервой 120 град"""
+    def __init__(self, channel, freq=PwmFreq.H50, extended=False, attach=False):
+        """
+        Конструктор класса
+        :param channel: номер канала
+        :param freq: частота работы
+        :param extended: флаг расширенного режима работы (0.5 - 2.5 мс, вместо 1 - 2 мс)
+        :param attach: подключиться к уже работающей микросхеме, не переинициализируя ее
+        """
+        global _pwmList
+        mode = _PwmMode.servo120
+        if _pwmList.get(channel) is None:
+            _pwmList[channel] = mode  # отмечаем, что канал занят
+            super(Servo120, self).__init__(channel, mode, freq, extended, attach)
+        else:
+            raise ValueError("This channel is already used!")
+
+
+class Servo180(PwmBase):
+    """Класс для управления сервой 180 град"""
+    def __init__(self, channel, freq=PwmFreq.H50, extended=False, attach=False):
+        """
+        Конструктор класса
+        :param channel: номер канала
+        :param freq: частота работы
+        :param extended: флаг расширенного режима работы (0.5 - 2.5 мс, вместо 1 - 2 мс)
+        :param attach: подключиться к уже работающей микросхеме, не переинициализируя ее
+        """
+        global _pwmList
+        mode = _PwmMode.servo180
+        if _pwmList.get(channel) is None:
+            _pwmList[channel] = mode    # отмечаем, что канал занят
+            super(Servo180, self).__init__(channel, mode, freq, extended, attach)
+        else:
+            raise ValueError("This channel is already used!")
+
+
+class Servo270(PwmBase):
+    """Класс для управления сервой 270 град"""
+    def __init__(self, channel, freq=PwmFreq.H50, extended=False, attach=False):
+        """
+        Конструктор класса
+        :param channel: номер канала
+        :param freq: частота работы
+        :param extended: флаг расширенного режима работы (0.5 - 2.5 мс, вместо 1 - 2 мс)
+        :param attach: подключиться к уже работающей микросхеме, не переинициализируя ее
+        """
+        global _pwmList
+        mode = _PwmMode.servo270
+        if _pwmList.get(channel) is None:
+            _pwmList[channel] = mode    # отмечаем, что канал занят
+            super(Servo270, self).__init__(channel, mode, freq, extended, attach)
+        else:
+            raise ValueError("This channel is already used!")
+
+
+class ForwardMotor(PwmBase):
+    """Класс для управления мотором с одним направлением"""
+    def __init__(self, channel, freq=PwmFreq.H50, extended=False, attach=False):
+        """
+        Конструктор класса
+        :param channel: номер канала
+        :param freq: частота работы
+        :param extended: флаг расширенного режима работы (0.5 - 2.5 мс, вместо 1 - 2 мс)
+        :param attach: подключиться к уже работающей микросхеме, не переинициализируя ее
+        """
+        if 0 <= channel < 12:
+            warnings.warn("Better use channels 12-15. Be sure that driver does not return voltage.")
+        global _pwmList
+        mode = _PwmMode.forwardMotor
+        if _pwmList.get(channel) is None:
+            _pwmList[channel] = mode    # отмечаем, что канал занят
+            super(ForwardMotor, self).__init__(channel, mode, freq, extended, attach)
+        else:
+            raise ValueError("This channel is already used!")
+
+
+class ReverseMotor(PwmBase):
+    """Класс для управления мотором с реверсом"""
+    def __init__(self, channel, freq=PwmFreq.H50, extended=False, attach=False):
+        """
+        Конструктор класса
+        :param channel: номер канала
+        :param freq: частота работы
+        :param extended: флаг расширенного режима работы (0.5 - 2.5 мс, вместо 1 - 2 мс)
+        :param attach: подключиться к уже работающей микросхеме, не переинициализируя ее
+        """
+        if 0 <= channel < 12:
+            warnings.warn("Better use channels 12-15. Be sure that driver does not return voltage.")
+        global _pwmList
+        mode = _PwmMode.reverseMotor
+        if _pwmList.get(channel) is None:
+            _pwmList[channel] = mode
+            super(ReverseMotor, self).__init__(channel, mode, freq, extended, attach)
+        else:
+            raise ValueError("This channel is already used!")
+
+class Switch(PwmBase):
+    """Класс реализующий только логические 0 и 1 на канале"""
+    def __init__(self, channel, freq=PwmFreq.H50, extended=False, attach=False):
+        """
+        Конструктор класса
+        :param channel: номер канала
+        :param freq: частота работы
+        :param extended: флаг расширенного режима работы (0.5 - 2.5 мс, вместо 1 - 2 мс)
+        :param attach: подключиться к уже работающей микросхеме, не переинициализируя ее
+        """
+        global _pwmList
+        mode = _PwmMode.onOff
+        if _pwmList.get(channel) is None:
+            _pwmList[channel] = mode
+            super(Switch, self).__init__(channel, mode, freq, extended, attach)
+        else:
+            raise ValueError("This channel is already used!")
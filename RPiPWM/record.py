@@ -0,0 +1,251 @@
+"""
+Запись и воспроизведение транзакций шины i2c.
+
+Формат журнала: заголовок файла (сигнатура + время начала записи), затем записи подряд.
+Каждая запись - заголовок фиксированного размера _RECORD и следом `length` байт данных
+(записанные байты для операций записи, прочитанные - для операций чтения).
+
+Запуск из командной строки:
+    python3 -m RPiPWM.record dump bus.log               # вывести все транзакции
+    python3 -m RPiPWM.record history bus.log 3          # значения канала 3 PCA9685 во времени
+    python3 -m RPiPWM.record replay bus.log [--fast]    # повторить транзакции на настоящей шине
+"""
+import argparse
+import mmap
+import struct
+import threading
+import time
+from array import array
+
+from . import bus
+from .bus import _I2c, _OP_READ_RAW, _OP_READ_U8, _OP_WRITE_BYTE, _OP_WRITE_BYTE_DATA, _OP_WRITE_LIST
+
+_MAGIC = b"RPWMLOG1"
+_FILE_HEADER = struct.Struct("<8sd")    # сигнатура, время начала записи (time.time())
+_RECORD = struct.Struct("<dBBBBH")      # время от начала (с), операция, шина, адрес, регистр, длина данных
+
+_OP_NAMES = {
+    _OP_READ_RAW: "readRaw",
+    _OP_READ_U8: "readU8",
+    _OP_WRITE_BYTE: "writeByte",
+    _OP_WRITE_BYTE_DATA: "writeByteData",
+    _OP_WRITE_LIST: "writeList",
+}
+
+# PCA9685: адрес и регистр старшего байта момента выключения канала 0 (см. RPiPWM.pwm)
+_PCA9685_ADDRESS = 0x40
+_LED0_OFF_L = 0x08
+_LED0_OFF_H = 0x09
+
+
+class BusRecorder:
+    """
+    Запись транзакций в двоичный журнал.
+    Записи копятся в буфере ограниченного размера и сбрасываются в файл одной операцией записи,
+    поэтому на каждую транзакцию приходится только упаковка заголовка.
+    """
+    def __init__(self, path: str, bufferSize=65536):
+        """
+        Конструктор класса
+        :param path: путь к файлу журнала (перезаписывается)
+        :param bufferSize: размер буфера в байтах, при заполнении он сбрасывается в файл
+        """
+        self._file = open(path, "wb")
+        self._bufferSize = bufferSize
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._file.write(_FILE_HEADER.pack(_MAGIC, time.time()))
+
+    def record(self, op: int, busNum: int, addr: int, register: int, data):
+        """Добавление транзакции в журнал (вызывается из _I2c)"""
+        timestamp = time.monotonic() - self._start
+        with self._lock:
+            if self._file is None:
+                return
+            self._buffer += _RECORD.pack(timestamp, op, busNum, addr, register, len(data))
+            self._buffer += bytes(data)
+            if len(self._buffer) >= self._bufferSize:
+                self._flush()
+
+    def _flush(self):
+        self._file.write(self._buffer)
+        self._buffer.clear()
+
+    def flush(self):
+        """Сброс буфера в файл"""
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+                self._file.flush()
+
+    def close(self):
+        """Сброс буфера и закрытие файла"""
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+                self._file.close()
+                self._file = None
+
+
+def startRecording(path: str, bufferSize=65536):
+    """
+    Начать запись всех транзакций шины в журнал (предыдущая запись, если была, завершается).
+    :param path: путь к файлу журнала
+    :param bufferSize: размер буфера записи в байтах
+    :return: объект BusRecorder
+    """
+    stopRecording()
+    bus._recorder = BusRecorder(path, bufferSize)
+    return bus._recorder
+
+
+def stopRecording():
+    """Завершить запись транзакций"""
+    recorder, bus._recorder = bus._recorder, None
+    if recorder is not None:
+        recorder.close()
+
+
+class BusLog:
+    """
+    Чтение журнала транзакций через mmap - файл не загружается в память целиком,
+    данные записей отдаются как memoryview без копирования.
+    """
+    def __init__(self, path: str):
+        """
+        Конструктор класса
+        :param path: путь к файлу журнала
+        """
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.startTime = _FILE_HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError("{} is not a bus log".format(path))
+        self._view = memoryview(self._map)
+
+    def close(self):
+        """Закрытие файла. Если на данные записей еще есть ссылки - файл закроется, когда они будут удалены"""
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        """
+        Перебор записей журнала.
+        :return: (время от начала записи, операция, шина, адрес, регистр, данные - memoryview)
+        """
+        offset = _FILE_HEADER.size
+        end = len(self._map)
+        unpack = _RECORD.unpack_from
+        size = _RECORD.size
+        while offset + size <= end:     # недописанный хвост (например, после сбоя) пропускаем
+            timestamp, op, busNum, addr, register, length = unpack(self._map, offset)
+            offset += size
+            if offset + length > end:
+                break
+            yield timestamp, op, busNum, addr, register, self._view[offset:offset + length]
+            offset += length
+
+    def channelHistory(self, channel: int, addr=_PCA9685_ADDRESS):
+        """
+        Значения канала PCA9685 во времени (момент выключения импульса, в "попугаях" микросхемы).
+        Значение фиксируется при записи старшего байта, так как его пишут последним.
+        :param channel: номер канала
+        :param addr: адрес микросхемы
+        :return: два массива - моменты времени (с) и значения
+        """
+        low = _LED0_OFF_L + 4 * channel
+        high = _LED0_OFF_H + 4 * channel
+        registers = bytearray(256)
+        times = array("d")
+        values = array("H")
+        for timestamp, op, busNum, recAddr, register, data in self:
+            if recAddr != addr or op not in (_OP_WRITE_BYTE_DATA, _OP_WRITE_LIST):
+                continue
+            if op == _OP_WRITE_LIST:    # блочная запись - с автоинкрементом регистра
+                registers[register:register + len(data)] = data
+                touched = register <= high < register + len(data)
+            else:
+                registers[register] = data[0]
+                touched = register == high
+            if touched:
+                times.append(timestamp)
+                values.append(((registers[high] & 0x0F) << 8) | registers[low])
+        return times, values
+
+
+def replay(path: str, realtime=True, target=None):
+    """
+    Повторение транзакций из журнала.
+    :param path: путь к файлу журнала
+    :param realtime: True - с исходными интервалами между транзакциями, False - как можно быстрее
+    :param target: объект с методами как у шины (readRaw, readU8, writeByte, writeByteData, writeList),
+    например симулятор. По умолчанию - настоящая шина с номером из журнала
+    :return: количество выполненных транзакций
+    """
+    buses = {}
+    count = 0
+    with BusLog(path) as log:
+        start = time.monotonic()
+        for timestamp, op, busNum, addr, register, data in log:
+            dev = target
+            if dev is None:
+                dev = buses.get(busNum)
+                if dev is None:
+                    dev = buses[busNum] = _I2c(busNum)
+            if realtime:
+                delay = start + timestamp - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            if op == _OP_READ_RAW:
+                dev.readRaw(addr, register, len(data))
+            elif op == _OP_READ_U8:
+                dev.readU8(addr, register)
+            elif op == _OP_WRITE_BYTE:
+                dev.writeByte(addr, register)
+            elif op == _OP_WRITE_BYTE_DATA:
+                dev.writeByteData(addr, register, data[0])
+            elif op == _OP_WRITE_LIST:
+                dev.writeList(addr, register, bytes(data))
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or replay an RPiPWM bus log")
+    sub = parser.add_subparsers(dest="command", required=True)
+    dump = sub.add_parser("dump", help="print all transactions")
+    dump.add_argument("log")
+    history = sub.add_parser("history", help="print PCA9685 channel values over time")
+    history.add_argument("log")
+    history.add_argument("channel", type=int)
+    replayer = sub.add_parser("replay", help="re-issue transactions on the real bus")
+    replayer.add_argument("log")
+    replayer.add_argument("--fast", action="store_true", help="ignore original timing")
+    args = parser.parse_args(argv)
+
+    if args.command == "dump":
+        with BusLog(args.log) as log:
+            for timestamp, op, busNum, addr, register, data in log:
+                print("{:12.6f} i2c-{} 0x{:02X} {:<13} reg=0x{:02X} {}".format(
+                    timestamp, busNum, addr, _OP_NAMES.get(op, op), register, bytes(data).hex()))
+    elif args.command == "history":
+        with BusLog(args.log) as log:
+            for timestamp, value in zip(*log.channelHistory(args.channel)):
+                print("{:12.6f} {}".format(timestamp, value))
+    else:
+        print("{} transactions replayed".format(replay(args.log, realtime=not args.fast)))
+
+
+if __name__ == "__main__":
+    main()
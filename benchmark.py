@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Набор бенчмарков для RPiPWM.
+Работает без железа: шина i2c и GPIO подменяются программной моделью, которая считает
+транзакции и переданные байты. Результаты выводятся в формате JSON (по одной записи на строку),
+чтобы их можно было сравнивать между коммитами.
+
+Запуск:
+    python3 benchmark.py                    # все тесты, вывод в stdout
+    python3 benchmark.py -o bench.jsonl     # сохранить результаты в файл
+    python3 benchmark.py --quick pwm image  # только выбранные группы, с меньшим числом повторов
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import types
+
+
+class FakeSMBus:
+    """
+    Программная модель шины i2c с интерфейсом модуля smbus.
+    Регистры устройств общие для всех объектов (как и у настоящей шины), счетчики - тоже.
+    """
+    registers = {}      # адрес устройства -> 256 байт регистров
+    transactions = 0    # сколько обращений к шине было сделано
+    bytes = 0           # сколько байт данных передано (без адресного байта)
+    missing = set()     # адреса устройств, которые не отвечают (обращение к ним - OSError, как при NACK)
+
+    def __init__(self, bus=1):
+        self.bus = bus
+
+    def close(self):
+        pass
+
+    @classmethod
+    def reset(cls):
+        """Сброс счетчиков (регистры остаются)"""
+        cls.transactions = 0
+        cls.bytes = 0
+
+    @classmethod
+    def _regs(cls, addr):
+        if addr in cls.missing:
+            raise OSError(121, "Remote I/O error")
+        regs = cls.registers.get(addr)
+        if regs is None:
+            regs = cls.registers[addr] = bytearray(256)
+        return regs
+
+    @classmethod
+    def _count(cls, size):
+        cls.transactions += 1
+        cls.bytes += size
+
+    def read_byte_data(self, addr, register):
+        self._count(2)
+        return self._regs(addr)[register]
+
+    def read_i2c_block_data(self, addr, cmd, length):
+        self._count(1 + length)
+        regs = self._regs(addr)
+        return [regs[(cmd + i) & 0xFF] for i in range(length)]
+
+    def write_byte(self, addr, value):
+        self._count(1)
+        self._regs(addr)
+
+    def write_byte_data(self, addr, register, value):
+        self._count(2)
+        self._regs(addr)[register] = value & 0xFF
+
+    def write_i2c_block_data(self, addr, cmd, data):
+        if len(data) > 32:
+            raise OSError("SMBus block write is limited to 32 bytes")
+        self._count(1 + len(data))
+        regs = self._regs(addr)
+        for i, value in enumerate(data):
+            regs[(cmd + i) & 0xFF] = value & 0xFF
+
+
+def _installFakes():
+    """Подменяем аппаратные модули до импорта библиотеки, чтобы не трогать настоящую шину"""
+    smbus = types.ModuleType("smbus")
+    smbus.SMBus = FakeSMBus
+    sys.modules["smbus"] = smbus
+
+    gpio = types.ModuleType("RPi.GPIO")
+    gpio.BCM = 11
+    gpio.IN, gpio.OUT = 1, 0
+    gpio.LOW, gpio.HIGH = 0, 1
+    gpio.PUD_OFF = 20
+    gpio.FALLING, gpio.RISING, gpio.BOTH = 32, 31, 33
+    for name in ("setwarnings", "setmode", "setup", "output", "add_event_detect",
+                 "remove_event_detect", "cleanup"):
+        setattr(gpio, name, lambda *args, **kwargs: None)
+    gpio.input = lambda *args, **kwargs: 1
+    rpi = types.ModuleType("RPi")
+    rpi.GPIO = gpio
+    sys.modules["RPi"] = rpi
+    sys.modules["RPi.GPIO"] = gpio
+
+
+_installFakes()
+import RPiPWM   # noqa: E402 - импорт только после подмены модулей
+
+
+class _FakeImage:
+    """Минимальная замена картинки PIL (режим '1'), если pillow не установлен"""
+    def __init__(self, width, height, seed=0):
+        self.mode = '1'
+        self.size = (width, height)
+        rnd = random.Random(seed)
+        self._pixels = {(x, y): rnd.choice((0, 255)) for x in range(width) for y in range(height)}
+
+    def load(self):
+        return self._pixels
+
+
+def _makeImage(width, height, seed=0):
+    """Случайная монохромная картинка заданного размера"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return _FakeImage(width, height, seed), "fake"
+    rnd = random.Random(seed)
+    image = Image.new('1', (width, height))
+    image.putdata([rnd.choice((0, 255)) for _ in range(width * height)])
+    return image, "pil"
+
+
+def _timeit(func, repeat):
+    """Выполняет func repeat раз, возвращает общее время и счетчики шины"""
+    FakeSMBus.reset()
+    start = time.perf_counter()
+    for i in range(repeat):
+        func(i)
+    elapsed = time.perf_counter() - start
+    return elapsed, FakeSMBus.transactions, FakeSMBus.bytes
+
+
+def benchPwm(repeat):
+    """Скорость обновления каналов ШИМ и число транзакций на одно обновление"""
+    devices = (
+        ("Servo180", RPiPWM.Servo180(0), lambda i: i % 181),
+        ("Servo270Extended", RPiPWM.Servo270(1, extended=True), lambda i: i % 271),
+        ("ReverseMotor", RPiPWM.ReverseMotor(12), lambda i: i % 201 - 100),
+        ("Switch", RPiPWM.Switch(2), lambda i: i % 2 == 0),
+    )
+    for name, device, valueOf in devices:
+        elapsed, transactions, size = _timeit(lambda i: device.setValue(valueOf(i)), repeat)
+        yield {
+            "bench": "pwm.setValue",
+            "params": {"device": name, "repeat": repeat},
+            "metrics": {
+                "updatesPerSec": repeat / elapsed,
+                "usPerUpdate": elapsed / repeat * 1e6,
+                "transactionsPerUpdate": transactions / repeat,
+                "bytesPerUpdate": size / repeat,
+            },
+        }
+    device = devices[0][1]
+    elapsed, transactions, size = _timeit(lambda i: device.setMcs(1000 + i % 1000), repeat)
+    yield {
+        "bench": "pwm.setMcs",
+        "params": {"device": "Servo180", "repeat": repeat},
+        "metrics": {
+            "updatesPerSec": repeat / elapsed,
+            "usPerUpdate": elapsed / repeat * 1e6,
+            "transactionsPerUpdate": transactions / repeat,
+            "bytesPerUpdate": size / repeat,
+        },
+    }
+
+
+_DISPLAYS = (
+    ("128x64", RPiPWM.SSD1306_128_64),
+    ("128x32", RPiPWM.SSD1306_128_32),
+    ("96x16", RPiPWM.SSD1306_96_16),
+)
+
+
+def benchDisplay(repeat):
+    """Частота кадров и объем данных на один кадр для каждого размера дисплея"""
+    for size, cls in _DISPLAYS:
+        disp = cls()
+        disp.begin()
+        elapsed, transactions, nbytes = _timeit(lambda i: disp.display(), repeat)
+        yield {
+            "bench": "display.display",
+            "params": {"size": size, "repeat": repeat},
+            "metrics": {
+                "framesPerSec": repeat / elapsed,
+                "msPerFrame": elapsed / repeat * 1e3,
+                "transactionsPerFrame": transactions / repeat,
+                "bytesPerFrame": nbytes / repeat,
+            },
+        }
+
+
+def benchImage(repeat):
+    """Время преобразования картинки PIL в буфер дисплея"""
+    for size, cls in _DISPLAYS:
+        disp = cls()
+        width, height = disp.getSize()
+        image, source = _makeImage(width, height)
+        elapsed, transactions, nbytes = _timeit(lambda i: disp.image(image), repeat)
+        yield {
+            "bench": "display.image",
+            "params": {"size": size, "repeat": repeat, "image": source},
+            "metrics": {
+                "msPerImage": elapsed / repeat * 1e3,
+                "imagesPerSec": repeat / elapsed,
+            },
+        }
+
+
+def benchBattery(repeat, duration):
+    """Затраты на опрос АЦП: одно измерение и нагрузка фонового потока фильтрации"""
+    adc = RPiPWM.Battery()
+    elapsed, transactions, nbytes = _timeit(lambda i: adc.getVoltageInstant(), repeat)
+    yield {
+        "bench": "battery.getVoltageInstant",
+        "params": {"repeat": repeat},
+        "metrics": {
+            "usPerSample": elapsed / repeat * 1e6,
+            "transactionsPerSample": transactions / repeat,
+            "bytesPerSample": nbytes / repeat,
+        },
+    }
+
+    # фоновый поток: основную часть времени спит, меряем сколько процессорного времени он съедает
+    FakeSMBus.reset()
+    cpuStart = time.process_time()
+    start = time.perf_counter()
+    adc.start()
+    time.sleep(duration)
+    adc.stop()
+    adc.join()
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpuStart
+    yield {
+        "bench": "battery.thread",
+        "params": {"duration": duration},
+        "metrics": {
+            "transactionsPerSec": FakeSMBus.transactions / wall,
+            "cpuFraction": cpu / wall,
+        },
+    }
+
+
+_STARTUP_SCRIPT = """
+import json, resource, sys, time
+modules = len(sys.modules)
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "msImport": elapsed * 1e3,
+    "maxRssDeltaKb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss,
+    "modulesLoaded": len(sys.modules) - modules,
+    "hardwareModules": sorted(name for name in ("smbus", "RPi.GPIO", "ctypes", "fcntl") if name in sys.modules),
+}}))
+"""
+
+
+def benchStartup(repeat):
+    """Время импорта и прирост памяти для пакета и каждого подмодуля (в чистом процессе)"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    for target in ("RPiPWM", "RPiPWM.bus", "RPiPWM.pwm", "RPiPWM.display", "RPiPWM.adc", "RPiPWM.gpio"):
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.check_output([sys.executable, "-c", _STARTUP_SCRIPT.format(target=target)], cwd=root)
+            runs.append(json.loads(output.decode()))
+        runs.sort(key=lambda run: run["msImport"])
+        metrics = runs[len(runs) // 2]   # медиана по времени импорта
+        yield {
+            "bench": "startup.import",
+            "params": {"module": target, "repeat": repeat},
+            "metrics": metrics,
+        }
+
+
+def _meta():
+    """Информация об окружении, чтобы результаты можно было сопоставить с коммитом"""
+    commit = None
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL,
+                                         cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return {
+        "bench": "meta",
+        "commit": commit,
+        "time": time.time(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+    }
+
+
+_GROUPS = ("pwm", "display", "image", "battery", "startup")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RPiPWM benchmarks on a simulated i2c bus")
+    parser.add_argument("groups", nargs="*", metavar="group",
+                        help="benchmark groups to run: {} (default: all)".format(", ".join(_GROUPS)))
+    parser.add_argument("-o", "--output", help="file to append JSON lines to (default: stdout)")
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions, for a fast sanity check")
+    args = parser.parse_args(argv)
+    for group in args.groups:
+        if group not in _GROUPS:
+            parser.error("unknown group: {}".format(group))
+
+    groups = args.groups or _GROUPS
+    scale = 10 if args.quick else 1
+    runners = {
+        "pwm": lambda: benchPwm(20000 // scale),
+        "display": lambda: benchDisplay(200 // scale),
+        "image": lambda: benchImage(50 // scale),
+        "battery": lambda: benchBattery(20000 // scale, 2.0 / scale),
+        "startup": lambda: benchStartup(1 if args.quick else 9),
+    }
+
+    out = open(args.output, "a") if args.output else sys.stdout
+    try:
+        results = [_meta()]
+        for group in _GROUPS:
+            if group in groups:
+                results.extend(runners[group]())
+        meta = results[0]
+        for result in results[1:]:
+            result["commit"] = meta["commit"]
+        for result in results:
+            out.write(json.dumps(result, sort_keys=True) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import RPiPWM
-import time
 from PIL import Image       # библиотеки для рисования на дисплее
 from PIL import ImageDraw
 from PIL import ImageFont
@@ -56,15 +55,19 @@ font = ImageFont.load_default()     # загружаем стандартный
 
 
 # функция, которая будет срабатывать при нажатии на кнопку
-def ButtonEvent(a):     # обязательно должна иметь один аргумент
+def ButtonEvent(event):     # обязательно должна иметь один аргумент - событие RPiPWM.ButtonEvent
     print("Somebody pressed button!")
 
 
 # создаем объект для работы с кнопкой и светодиодом
 gpio = RPiPWM.Gpio()
 gpio.buttonAddEvent(ButtonEvent)    # связываем нажатие на кнопку с функцией
+gpio.ledPattern(RPiPWM.LedPattern.blink(0.5))   # светодиод мигает сам, в фоновом потоке
 
-while True:
+
+# функция одного шага цикла, вызывается раз в секунду (номер шага нам не нужен)
+def loopStep(tick):
+    global switchState, servo180Value, servo270Value, motorValue, servo180Back, servo270Back, revMotorBack
     switchState = not switchState   # переключаем вкл/выкл
 
     if servo180Back is False:       # идем по диапазону от 0 до 180
@@ -105,6 +108,7 @@ while True:
     servo270.setValue(servo270Value)
     switch.setValue(switchState)
     motor.setValue(motorValue)
+    # значения уйдут на микросхему в конце шага, но getMcs уже возвращает новое (см. RPiPWM.stagePwm)
     print("Channel %d:\t%d val,\t%.2f ms"
           % (chanSrv180, servo180.getValue(), servo180.getMcs()))
     voltage = adc.getVoltageFiltered()  # получаем напряжение аккумулятора
@@ -118,6 +122,8 @@ while True:
     disp.image(image)   # записываем изображение в буффер
     disp.display()      # выводим его на экран
 
-    gpio.ledToggle()    # переключаем светодиод
 
-    time.sleep(1)
\ No newline at end of file
+# цикл с постоянной частотой: моменты вызова не "уплывают" на время выполнения шага,
+# а значения каналов, заданные за шаг, отправляются на микросхему вместе в конце шага
+loop = RPiPWM.ControlLoop(loopStep, rate=1)
+loop.run()
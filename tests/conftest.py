@@ -0,0 +1,22 @@
+"""
+Тесты работают без Raspberry Pi: модули smbus и RPi.GPIO подменяются моделью шины из benchmark.py
+(FakeSMBus) до импорта библиотеки.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark    # noqa: E402 - подменяет smbus и RPi.GPIO при импорте
+from benchmark import FakeSMBus     # noqa: E402
+
+
+@pytest.fixture
+def fakeBus():
+    """Модель шины: счетчики сброшены, все устройства отвечают"""
+    FakeSMBus.reset()
+    FakeSMBus.missing = set()
+    yield FakeSMBus
+    FakeSMBus.missing = set()
@@ -0,0 +1,107 @@
+import math
+import multiprocessing
+import struct
+import threading
+import time
+
+import pytest
+
+from RPiPWM.daemon import _Snapshot, PwmProxy, BusDaemon, DaemonClient
+
+
+def _publishForever(path, stop):
+    """Демон в отдельном процессе: непрерывно публикует снимки, где все значения одинаковые"""
+    snapshot = _Snapshot(path, create=True)
+    value = 0.0
+    while not stop.is_set():
+        value += 1
+        snapshot._values = [value] * 16
+        snapshot._voltage = value
+        snapshot._publish()
+
+
+def test_snapshot_is_never_torn(tmp_path):
+    path = str(tmp_path / "shm")
+    _Snapshot(path, create=True).close()
+    context = multiprocessing.get_context("fork")
+    stop = context.Event()
+    writer = context.Process(target=_publishForever, args=(path, stop))
+    writer.start()
+    try:
+        reader = _Snapshot(path)
+        published = 0
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline or not published:
+            values, voltage = reader.read()
+            if not math.isnan(voltage):     # NaN - писатель еще не начал
+                assert values == [voltage] * 16
+                published += 1
+        reader.close()
+    finally:
+        stop.set()
+        writer.join(5)
+
+
+def test_snapshot_read_gives_up_on_stale_write(tmp_path):
+    path = str(tmp_path / "shm")
+    writer = _Snapshot(path, create=True)
+    struct.pack_into("<I", writer._map, 0, 7)   # демон завершился посреди записи - счетчик остался нечетным
+    reader = _Snapshot(path)
+    with pytest.raises(RuntimeError):
+        reader.read(timeout=0.01)
+
+
+class _FakeClient:
+    """Клиент, у которого есть только разделяемая память"""
+    def __init__(self, values):
+        self._values = values
+
+    def snapshot(self):
+        return self._values + [math.nan] * (16 - len(self._values)), math.nan
+
+
+def test_switch_proxy_value_is_bool():
+    client = _FakeClient([1.0, 0.0, 90.0])
+    assert PwmProxy(client, "pwm0", 0, "Switch").getValue() is True
+    assert PwmProxy(client, "pwm1", 1, "Switch").getValue() is False
+    value = PwmProxy(client, "pwm2", 2, "Servo180").getValue()
+    assert value == 90 and type(value) is int
+
+
+@pytest.fixture
+def runningDaemon(tmp_path, fakeBus):
+    """Демон в отдельном потоке и подключенный к нему клиент"""
+    paths = str(tmp_path / "sock"), str(tmp_path / "shm")
+    daemon = BusDaemon(*paths)
+    thread = threading.Thread(target=daemon.serveForever)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while True:
+        try:
+            client = DaemonClient(*paths)
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+    yield paths, client
+    client.close()
+    daemon.shutdown()
+    thread.join(2)
+
+
+def test_second_daemon_refuses_to_start(runningDaemon, tmp_path):
+    (socketPath, shmPath), client = runningDaemon
+    client.Servo180(6).setValue(30)
+    with pytest.raises(RuntimeError):
+        BusDaemon(socketPath, str(tmp_path / "other")).serveForever()
+    assert client.snapshot()[0][6] == 30    # снимок первого демона не обнулен, сокет на месте
+    assert client.call("pwm:6", "getValue") == 30
+
+
+def test_channel_parameters_must_match(runningDaemon):
+    paths, client = runningDaemon
+    client.Servo180(7)
+    client.Servo180(7)
+    with pytest.raises(ValueError):
+        client.Servo180(7, extended=True)
@@ -0,0 +1,20 @@
+import threading
+import time
+
+import RPiPWM
+from RPiPWM import gpio
+
+
+def test_cleanup_with_queued_edges(fakeBus, monkeypatch):
+    errors = []
+    monkeypatch.setattr(threading, "excepthook", errors.append)
+    gpio._loadGpio()
+    board = RPiPWM.Gpio()
+    board.buttonAddEvent(lambda event: time.sleep(0.01))
+    dispatcher = board._button
+    now = time.monotonic()
+    dispatcher._edges.put((now, gpio.GPIO.LOW))    # фронты, пришедшие прямо перед cleanUp
+    dispatcher._edges.put((now + 0.001, gpio.GPIO.HIGH))
+    board.cleanUp()
+    assert not dispatcher.is_alive()
+    assert errors == []
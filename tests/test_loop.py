@@ -0,0 +1,70 @@
+import time
+
+import RPiPWM
+from RPiPWM.pwm import _PCA9685_ADDRESS, _LED0_OFF_L
+
+
+def _offCount(bus, channel):
+    regs = bus.registers[_PCA9685_ADDRESS]
+    low = _LED0_OFF_L + 4 * channel
+    return regs[low] | (regs[low + 1] << 8)
+
+
+def test_stats_while_running_in_thread(fakeBus):
+    servo = RPiPWM.Servo180(2)
+    loop = RPiPWM.ControlLoop(lambda tick: servo.setValue(tick % 180), rate=2000)
+    loop.start()
+    try:
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            stats = loop.getStats()     # не должно быть "deque mutated during iteration"
+    finally:
+        loop.stop()
+        loop.join(2)
+    assert stats["ticks"] > 0
+    assert stats["stepMax"] >= stats["stepP50"]
+
+
+def test_staging_does_not_delay_other_threads(fakeBus):
+    loopServo = RPiPWM.Servo180(3)
+    servo = RPiPWM.Servo180(4)
+    loop = RPiPWM.ControlLoop(lambda tick: loopServo.setValue(90), rate=10)
+    loop.start()
+    try:
+        servo.setValue(0)
+        servo.setValue(180)
+        assert _offCount(fakeBus, 4) == servo._max     # записано сразу, без ожидания конца шага цикла
+    finally:
+        loop.stop()
+        loop.join(2)
+
+
+def test_loop_keeps_outer_staging(fakeBus):
+    servo = RPiPWM.Servo180(5)
+    servo.setValue(0)
+    before = _offCount(fakeBus, 5)
+    RPiPWM.stagePwm()
+    try:
+        RPiPWM.ControlLoop(lambda tick: None, rate=1000, ticks=2).run()
+        servo.setValue(180)     # после цикла отложенная запись должна остаться включенной
+        assert _offCount(fakeBus, 5) == before
+        assert servo.getMcs() == 2000   # но getMcs уже видит новое значение
+    finally:
+        RPiPWM.stagePwm(False)
+    assert _offCount(fakeBus, 5) == servo._max
+
+
+def test_overrun_skip_and_catch_up(fakeBus):
+    def slowFirst(tick):
+        if tick == 0:
+            time.sleep(0.035)
+
+    skip = RPiPWM.ControlLoop(slowFirst, rate=100, ticks=5)
+    skip.run()
+    stats = skip.getStats()
+    assert stats["ticks"] == 5 and stats["overruns"] == 1 and stats["skipped"] >= 3
+
+    catchUp = RPiPWM.ControlLoop(slowFirst, rate=100, ticks=5, overrun=RPiPWM.Overrun.CATCH_UP)
+    catchUp.run()
+    stats = catchUp.getStats()
+    assert stats["ticks"] == 5 and stats["skipped"] == 0 and stats["overruns"] >= 1
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+import RPiPWM
+from RPiPWM.power import IdleManager
+from RPiPWM.pwm import _PCA9685_ADDRESS, _MODE1, _SLEEP
+from RPiPWM.display import _SSD1306_I2C_ADDRESS
+
+
+def _waitFor(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def _pwmSleeping(bus):
+    return bool(bus.registers[_PCA9685_ADDRESS][_MODE1] & _SLEEP)
+
+
+def test_missing_display_does_not_kill_manager(fakeBus):
+    servo = RPiPWM.Servo180(0)
+    fakeBus.missing = {_SSD1306_I2C_ADDRESS}
+    manager = IdleManager(timeout=0.1)
+    with pytest.warns(UserWarning, match="0x3C"):
+        manager.start()
+        assert _waitFor(lambda: _pwmSleeping(fakeBus))
+    try:
+        assert manager.is_alive()
+        servo.setValue(90)
+        assert not _pwmSleeping(fakeBus)
+        assert manager.getStats()["wakeCount"] == 1
+    finally:
+        manager.stop()
+
+
+def test_command_during_sleep_wakes_chip(fakeBus):
+    servo = RPiPWM.Servo180(1)
+    manager = IdleManager(timeout=0.1, display=False)
+    write = manager._i2c.writeByteData
+    commands = []
+
+    def writeAndInterfere(addr, register, value):
+        """Команда пользователя приходит сразу после записи SLEEP, пока менеджер еще в _sleep"""
+        write(addr, register, value)
+        if register == _MODE1 and value & _SLEEP and not commands:
+            command = threading.Thread(target=servo.setValue, args=(45,))
+            commands.append(command)
+            command.start()
+            command.join(0.05)  # команда должна дождаться, пока менеджер закончит усыпление
+
+    manager._i2c.writeByteData = writeAndInterfere
+    manager.start()
+    try:
+        assert _waitFor(lambda: bool(commands))
+        commands[0].join(2.0)
+        assert not commands[0].is_alive()
+        assert not _pwmSleeping(fakeBus)
+        assert manager.getStats()["wakeCount"] == 1
+    finally:
+        manager.stop()
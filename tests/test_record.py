@@ -0,0 +1,22 @@
+import pytest
+
+from RPiPWM import bus
+from RPiPWM.bus import _I2c, _OP_WRITE_BYTE_DATA
+from RPiPWM.record import startRecording, stopRecording, BusLog
+
+
+def test_failed_write_is_not_recorded(fakeBus, tmp_path):
+    path = str(tmp_path / "bus.log")
+    i2c = _I2c()
+    fakeBus.missing = {0x3C}
+    startRecording(path)
+    try:
+        i2c.writeByteData(0x40, 0x06, 0x12)
+        with pytest.raises(OSError):
+            i2c.writeByteData(0x3C, 0x00, 0xAE)    # NACK - байт на шину не ушел
+    finally:
+        stopRecording()
+    assert bus._recorder is None
+    with BusLog(path) as log:
+        records = [(op, addr, register, bytes(data)) for _, op, _, addr, register, data in log]
+    assert records == [(_OP_WRITE_BYTE_DATA, 0x40, 0x06, b"\x12")]